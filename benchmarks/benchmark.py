@@ -0,0 +1,255 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from pixel_font_builder import FontBuilder, Glyph
+
+from pixel_font_build_tools import DesignContext, GlyphBitmap, validation
+from pixel_font_build_tools.build import FontTarget, FontCollectionTarget, build_fonts
+from pixel_font_build_tools.utils import fs_util, glyph_util
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('benchmark')
+
+project_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+benchmarks_dir = os.path.join(project_root_dir, 'build', 'benchmarks')
+
+dir_flavors = [
+    'monospaced',
+    'proportional',
+]
+
+name_flavors = [
+    'latin',
+    'zh_cn',
+    'zh_hk',
+    'zh_tw',
+    'zh_tr',
+    'ja',
+    'ko',
+]
+
+glyph_size = 12
+
+# Code point ranges the synthetic glyphs are drawn from, in order: Latin for the dir flavors, then CJK blocks in 'common'.
+latin_code_points = list(range(0x0021, 0x007F))
+cjk_code_points = [
+    *range(0x4E00, 0x9FFF + 1),  # CJK Unified Ideographs
+    *range(0x3400, 0x4DBF + 1),  # CJK Unified Ideographs Extension A
+    *range(0xAC00, 0xD7A3 + 1),  # Hangul Syllables
+    *range(0x20000, 0x2A6DF + 1),  # CJK Unified Ideographs Extension B
+]
+
+
+def _create_random_bitmap(rng: random.Random) -> GlyphBitmap:
+    data = [[1 if rng.random() < 0.3 else 0 for _ in range(glyph_size)] for _ in range(glyph_size)]
+    return GlyphBitmap.from_glyph_data(data)
+
+
+def generate_glyphs(root_dir: str, glyph_count: int, seed: int = 0):
+    # Files are written flat into each dir flavor, so the first standardize has to move all of them into block dirs.
+    rng = random.Random(seed)
+    fs_util.delete_dir(root_dir)
+    for dir_flavor in ['common', *dir_flavors]:
+        fs_util.make_dirs(os.path.join(root_dir, dir_flavor))
+
+    file_paths = []
+    bitmap = _create_random_bitmap(rng)
+    file_paths.append(os.path.join(root_dir, 'common', 'notdef.png'))
+    for dir_flavor in dir_flavors:
+        for code_point in latin_code_points:
+            file_paths.append(os.path.join(root_dir, dir_flavor, f'{code_point:04X}.png'))
+    for code_point in cjk_code_points[:max(0, glyph_count - len(file_paths))]:
+        file_paths.append(os.path.join(root_dir, 'common', f'{code_point:04X}.png'))
+        if len(file_paths) < glyph_count and rng.random() < 0.1:
+            file_paths.append(os.path.join(root_dir, 'common', f'{code_point:04X} zh_hk,zh_tw.png'))
+        if len(file_paths) < glyph_count and rng.random() < 0.05:
+            file_paths.append(os.path.join(root_dir, 'common', f'{code_point:04X} ja,ko.png'))
+
+    for file_path in file_paths[:glyph_count]:
+        if rng.random() < 0.5:
+            bitmap = _create_random_bitmap(rng)
+        bitmap.save_png(file_path)
+
+
+def _measure(
+        results: list[dict[str, object]],
+        glyph_count: int,
+        stage: str,
+        func: Callable[[], object],
+        setup: Callable[[], None] = None,
+        trace_memory: bool = True,
+) -> object:
+    # Wall time and peak memory come from separate runs, so tracing overhead does not leak into the timing.
+    if setup is not None:
+        setup()
+    start_time = time.perf_counter()
+    value = func()
+    wall_time = time.perf_counter() - start_time
+
+    peak_memory = None
+    if trace_memory:
+        del value
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        value = func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    results.append({
+        'glyph_count': glyph_count,
+        'stage': stage,
+        'wall_time': wall_time,
+        'peak_memory': peak_memory,
+    })
+    logger.info("%d glyphs, %s: %.3f s, %s bytes", glyph_count, stage, wall_time, peak_memory)
+    return value
+
+
+def _load_context(root_dir: str, **kwargs) -> DesignContext:
+    return DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors, **kwargs)
+
+
+def _query_all(context: DesignContext):
+    for dir_flavor in ['common', *dir_flavors]:
+        context.get_sequence(dir_flavor)
+        context.get_alphabet(dir_flavor)
+        for name_flavor in name_flavors:
+            context.get_character_mapping(dir_flavor, name_flavor)
+            context.get_glyph_files(dir_flavor, [name_flavor])
+        context.get_glyph_files(dir_flavor)
+
+
+def _create_builder(
+        context: DesignContext,
+        glyph_cacher: dict[str, Glyph],
+        dir_flavor: str,
+        name_flavor: str,
+        is_collection: bool,
+) -> FontBuilder:
+    # Only what a font needs to be written, so the stage measures the build tools rather than font metadata.
+    builder = FontBuilder(glyph_size)
+    builder.meta_info.family_name = f'Benchmark {dir_flavor} {name_flavor}'
+    builder.horizontal_header.ascent = glyph_size
+    builder.vertical_header.ascent = glyph_size
+    builder.character_mapping.update(context.get_character_mapping(dir_flavor, name_flavor))
+    for glyph_file in context.get_glyph_files(dir_flavor, None if is_collection else [name_flavor]):
+        if glyph_file.file_path in glyph_cacher:
+            glyph = glyph_cacher[glyph_file.file_path]
+        else:
+            glyph = Glyph(
+                name=glyph_file.glyph_name,
+                advance_width=glyph_file.glyph_width,
+                advance_height=glyph_size,
+                data=glyph_file.glyph_data,
+            )
+            glyph_cacher[glyph_file.file_path] = glyph
+        builder.glyphs.append(glyph)
+    return builder
+
+
+def _create_build_targets(outputs_dir: str) -> list[FontTarget | FontCollectionTarget]:
+    targets = []
+    for dir_flavor in dir_flavors:
+        for name_flavor in ['latin', 'zh_cn']:
+            for font_format in ['otf', 'bdf']:
+                targets.append(FontTarget(os.path.join(outputs_dir, f'{dir_flavor}-{name_flavor}.{font_format}'), font_format, dir_flavor, name_flavor))
+        targets.append(FontCollectionTarget(os.path.join(outputs_dir, f'{dir_flavor}.otc'), 'otc', dir_flavor, ['latin', 'zh_cn']))
+    return targets
+
+
+def run_benchmark(work_dir: str, glyph_count: int, workers: int) -> list[dict[str, object]]:
+    results = []
+    root_dir = os.path.join(work_dir, f'glyphs-{glyph_count}')
+    cache_dir = os.path.join(work_dir, f'cache-{glyph_count}')
+    generate_glyphs(root_dir, glyph_count)
+
+    context = _load_context(root_dir)
+    _measure(results, glyph_count, 'standardize_glyph_files (cold)', context.standardize_glyph_files, trace_memory=False)
+    _measure(results, glyph_count, 'standardize_glyph_files (no-op)', context.standardize_glyph_files, trace_memory=False)
+
+    _measure(results, glyph_count, 'validate', lambda: validation.validate_glyph_files(root_dir, dir_flavors, name_flavors))
+    _measure(results, glyph_count, 'validate (png headers)', lambda: validation.validate_glyph_files(root_dir, dir_flavors, name_flavors, check_png_headers=True))
+    _measure(results, glyph_count, 'load', lambda: _load_context(root_dir))
+    _measure(results, glyph_count, 'load (lazy)', lambda: _load_context(root_dir, lazy=True))
+    if workers > 1:
+        _measure(results, glyph_count, f'load (workers={workers})', lambda: _load_context(root_dir, workers=workers))
+    _measure(results, glyph_count, 'load (cache cold)', lambda: _load_context(root_dir, cache_dir=cache_dir), setup=lambda: fs_util.delete_dir(cache_dir))
+    _measure(results, glyph_count, 'load (cache warm)', lambda: _load_context(root_dir, cache_dir=cache_dir))
+
+    context = _load_context(root_dir, lazy=True)
+    _measure(results, glyph_count, 'queries (cold)', lambda: _query_all(context), setup=context.fallback_default_name_flavor)
+    _measure(results, glyph_count, 'queries (cached)', lambda: _query_all(context))
+
+    file_paths = list(context.path_to_glyph_file)
+    png_file_path = os.path.join(work_dir, 'round-trip.png')
+    _measure(results, glyph_count, 'png decode', lambda: [glyph_util.load_packed_glyph_data_from_png(file_path) for file_path in file_paths])
+    bitmaps = [GlyphBitmap.load_png(file_path) for file_path in file_paths]
+    _measure(results, glyph_count, 'png encode', lambda: [bitmap.save_png(png_file_path) for bitmap in bitmaps], trace_memory=False)
+
+    # The context is decoded up front, so the stage times building and writing the fonts only.
+    # Peak memory is traced in this process, so with workers it leaves out what the worker processes allocate.
+    context = _load_context(root_dir)
+    outputs_dir = os.path.join(work_dir, f'outputs-{glyph_count}')
+    fs_util.make_dirs(outputs_dir)
+    targets = _create_build_targets(outputs_dir)
+    _measure(results, glyph_count, 'build_fonts', lambda: build_fonts(context, targets, _create_builder))
+    if workers > 1:
+        _measure(results, glyph_count, f'build_fonts (workers={workers})', lambda: build_fonts(context, targets, _create_builder, workers=workers))
+
+    return results
+
+
+def measure_cli_cold_start(runs: int = 5) -> float:
+    # Best of several runs of a fresh interpreter, since this is what every pipeline step pays.
+    env = dict(os.environ, PYTHONPATH=os.path.join(project_root_dir, 'src'))
+    wall_times = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'pixel_font_build_tools', '--help'], env=env, stdout=subprocess.DEVNULL, check=True)
+        wall_times.append(time.perf_counter() - start_time)
+    wall_time = min(wall_times)
+    logger.info("CLI cold start: %.3f s", wall_time)
+    return wall_time
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description='Benchmark the load, query, standardize, build and PNG stages on synthetic glyph trees.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000], help='glyph counts of the generated trees')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='workers for the parallel load and build stages')
+    parser.add_argument('--work-dir', default=benchmarks_dir, help='directory of the generated glyph trees and caches')
+    parser.add_argument('--output', default=None, help="path of the JSON report, 'results.json' in the work dir by default")
+    parser.add_argument('--skip-cli-cold-start', action='store_true', help='do not measure the CLI cold start')
+    args = parser.parse_args(argv)
+
+    if args.output is None:
+        args.output = os.path.join(args.work_dir, 'results.json')
+    fs_util.make_dirs(args.work_dir)
+    results = []
+    for glyph_count in args.sizes:
+        results.extend(run_benchmark(args.work_dir, glyph_count, args.workers))
+
+    report = {
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'cli_cold_start': None if args.skip_cli_cold_start else measure_cli_cold_start(),
+        'results': results,
+    }
+    fs_util.make_dirs(os.path.dirname(os.path.abspath(args.output)))
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    logger.info("Write benchmark report: '%s'", args.output)
+
+
+if __name__ == '__main__':
+    main()
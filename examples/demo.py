@@ -3,10 +3,10 @@ import math
 import os
 from types import SimpleNamespace
 
-from pixel_font_builder import FontCollectionBuilder, Glyph, FontBuilder, StyleName, SerifMode
-from pixel_font_builder.opentype import Flavor
+from pixel_font_builder import Glyph, FontBuilder, StyleName, SerifMode
 
 from pixel_font_build_tools import DesignContext
+from pixel_font_build_tools.build import FontTarget, FontCollectionTarget, build_fonts
 from pixel_font_build_tools.utils import fs_util
 
 logging.basicConfig(level=logging.DEBUG)
@@ -112,50 +112,23 @@ def _create_builder(
     return builder
 
 
-def make_font_files(context: DesignContext, width_mode: str):
-    glyph_cacher = {}
-
-    for language_flavor in language_flavors:
-        builder = _create_builder(context, glyph_cacher, width_mode, language_flavor, is_collection=False)
-
-        otf_file_path = os.path.join(outputs_dir, f'demo-{width_mode}-{language_flavor}.otf')
-        builder.save_otf(otf_file_path)
-        logger.info("Make font file: '%s'", otf_file_path)
-
-        woff2_file_path = os.path.join(outputs_dir, f'demo-{width_mode}-{language_flavor}.woff2')
-        builder.save_otf(woff2_file_path, flavor=Flavor.WOFF2)
-        logger.info("Make font file: '%s'", woff2_file_path)
-
-        ttf_file_path = os.path.join(outputs_dir, f'demo-{width_mode}-{language_flavor}.ttf')
-        builder.save_ttf(ttf_file_path)
-        logger.info("Make font file: '%s'", ttf_file_path)
-
-        bdf_file_path = os.path.join(outputs_dir, f'demo-{width_mode}-{language_flavor}.bdf')
-        builder.save_bdf(bdf_file_path)
-        logger.info("Make font file: '%s'", bdf_file_path)
-
-    collection_builder = FontCollectionBuilder()
-    for language_flavor in language_flavors:
-        builder = _create_builder(context, glyph_cacher, width_mode, language_flavor, is_collection=True)
-        collection_builder.font_builders.append(builder)
-
-    otc_file_path = os.path.join(outputs_dir, f'demo-{width_mode}.otc')
-    collection_builder.save_otc(otc_file_path)
-    logger.info("Make font collection file: '%s'", otc_file_path)
-
-    ttc_file_path = os.path.join(outputs_dir, f'demo-{width_mode}.ttc')
-    collection_builder.save_ttc(ttc_file_path)
-    logger.info("Make font collection file: '%s'", ttc_file_path)
-
-
 def main():
     fs_util.delete_dir(outputs_dir)
     fs_util.make_dirs(outputs_dir)
 
     context = DesignContext.load(glyphs_dir, defined_dir_flavors=width_modes, defined_name_flavors=language_flavors)
     context.standardize_glyph_files()
-    for weight_mode in width_modes:
-        make_font_files(context, weight_mode)
+
+    targets = []
+    for width_mode in width_modes:
+        for language_flavor in language_flavors:
+            for font_format in ['otf', 'woff2', 'ttf', 'bdf']:
+                file_path = os.path.join(outputs_dir, f'demo-{width_mode}-{language_flavor}.{font_format}')
+                targets.append(FontTarget(file_path, font_format, width_mode, language_flavor))
+        for font_format in ['otc', 'ttc']:
+            file_path = os.path.join(outputs_dir, f'demo-{width_mode}.{font_format}')
+            targets.append(FontCollectionTarget(file_path, font_format, width_mode, language_flavors))
+    build_fonts(context, targets, _create_builder, workers=os.cpu_count())
 
 
 if __name__ == '__main__':
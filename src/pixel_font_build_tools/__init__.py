@@ -1 +1,23 @@
-from pixel_font_build_tools.context import DesignContext, GlyphInfo, GlyphFile
+import importlib
+
+# Same as 'typing.TYPE_CHECKING', without paying for importing 'typing' at startup.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pixel_font_build_tools.bitmap import GlyphBitmap
+    from pixel_font_build_tools.context import DesignContext, GlyphInfo, GlyphFile
+
+# Resolved on first access, so importing the package or its CLI stays cheap.
+_lazy_attribute_modules = {
+    'GlyphBitmap': 'pixel_font_build_tools.bitmap',
+    'DesignContext': 'pixel_font_build_tools.context',
+    'GlyphInfo': 'pixel_font_build_tools.context',
+    'GlyphFile': 'pixel_font_build_tools.context',
+}
+
+__all__ = list(_lazy_attribute_modules)
+
+
+def __getattr__(name: str) -> object:
+    if name in _lazy_attribute_modules:
+        return getattr(importlib.import_module(_lazy_attribute_modules[name]), name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -0,0 +1,5 @@
+import sys
+
+from pixel_font_build_tools.cli import main
+
+sys.exit(main())
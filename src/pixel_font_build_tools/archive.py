@@ -0,0 +1,101 @@
+import mmap
+import os
+import struct
+
+from pixel_font_build_tools.bitmap import GlyphBitmap
+
+_MAGIC = b'PFBA'
+_VERSION = 2
+
+# magic, version, dir flavor count, name flavor count, glyph count
+_HEADER_FORMAT = struct.Struct('<4sHHHI')
+# code point, dir flavor index (0 is 'common'), name flavor mask, width, height, bitmap offset, file mtime ns, file size, path length
+# The file mtime and size are those the bitmap was read at, both -1 when it was not read from the file.
+_ENTRY_FORMAT = struct.Struct('<iHIHHQqqH')
+_STRING_LENGTH_FORMAT = struct.Struct('<H')
+
+ArchiveEntry = tuple[str, int, str, list[str], GlyphBitmap, tuple[int, int] | None]
+
+
+def _pack_string(value: str) -> bytes:
+    value = value.encode()
+    return _STRING_LENGTH_FORMAT.pack(len(value)) + value
+
+
+def _unpack_string(buffer: mmap.mmap, offset: int) -> tuple[str, int]:
+    length, = _STRING_LENGTH_FORMAT.unpack_from(buffer, offset)
+    offset += _STRING_LENGTH_FORMAT.size
+    return buffer[offset:offset + length].decode(), offset + length
+
+
+def save_archive(
+        file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+        defined_dir_flavors: list[str],
+        defined_name_flavors: list[str],
+        entries: list[ArchiveEntry],
+):
+    assert len(defined_name_flavors) <= 32, f"Too many name flavors for an archive: {len(defined_name_flavors)}"
+    dir_flavors = ['common', *defined_dir_flavors]
+
+    header = bytearray(_HEADER_FORMAT.pack(_MAGIC, _VERSION, len(defined_dir_flavors), len(defined_name_flavors), len(entries)))
+    for flavor in [*defined_dir_flavors, *defined_name_flavors]:
+        header += _pack_string(flavor)
+    paths = [relative_path.encode() for relative_path, _, _, _, _, _ in entries]
+    bitmap_offset = len(header) + len(entries) * _ENTRY_FORMAT.size + sum(len(path) for path in paths)
+
+    # Identical bitmaps are stored once and shared by every entry pointing at them.
+    bitmap_to_offset = {}
+    for (_, code_point, dir_flavor, name_flavors, bitmap, stat_key), path in zip(entries, paths):
+        name_flavor_mask = 0
+        for name_flavor in name_flavors:
+            name_flavor_mask |= 1 << defined_name_flavors.index(name_flavor)
+        if bitmap not in bitmap_to_offset:
+            bitmap_to_offset[bitmap] = bitmap_offset
+            bitmap_offset += len(bitmap.packed)
+        mtime_ns, size = (-1, -1) if stat_key is None else stat_key
+        header += _ENTRY_FORMAT.pack(code_point, dir_flavors.index(dir_flavor), name_flavor_mask, bitmap.width, bitmap.height, bitmap_to_offset[bitmap], mtime_ns, size, len(path))
+        header += path
+
+    temp_file_path = f'{os.fspath(file_path)}.{os.getpid()}.tmp'
+    with open(temp_file_path, 'wb') as file:
+        file.write(header)
+        for bitmap in bitmap_to_offset:
+            file.write(bitmap.packed)
+    os.replace(temp_file_path, file_path)
+
+
+def load_archive(
+        file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+) -> tuple[list[str], list[str], list[ArchiveEntry]]:
+    with open(file_path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, dir_flavor_count, name_flavor_count, entry_count = _HEADER_FORMAT.unpack_from(buffer, 0)
+    assert magic == _MAGIC, f"Not a glyph archive: '{file_path}'"
+    assert version == _VERSION, f"Unsupported glyph archive version {version}: '{file_path}'"
+
+    offset = _HEADER_FORMAT.size
+    flavors = []
+    for _ in range(dir_flavor_count + name_flavor_count):
+        flavor, offset = _unpack_string(buffer, offset)
+        flavors.append(flavor)
+    defined_dir_flavors = flavors[:dir_flavor_count]
+    defined_name_flavors = flavors[dir_flavor_count:]
+    dir_flavors = ['common', *defined_dir_flavors]
+
+    # Bitmaps are slices of the mapping, so nothing is copied until a bitmap leaves the process.
+    view = memoryview(buffer)
+    offset_to_bitmap = {}
+    entries = []
+    for _ in range(entry_count):
+        code_point, dir_flavor_index, name_flavor_mask, width, height, bitmap_offset, mtime_ns, size, path_length = _ENTRY_FORMAT.unpack_from(buffer, offset)
+        offset += _ENTRY_FORMAT.size
+        relative_path = buffer[offset:offset + path_length].decode()
+        offset += path_length
+        name_flavors = [name_flavor for i, name_flavor in enumerate(defined_name_flavors) if name_flavor_mask & (1 << i)]
+        bitmap = offset_to_bitmap.get((bitmap_offset, width, height), None)
+        if bitmap is None:
+            bitmap = GlyphBitmap(width, height, view[bitmap_offset:bitmap_offset + (width + 7) // 8 * height])
+            offset_to_bitmap[bitmap_offset, width, height] = bitmap
+        stat_key = None if mtime_ns == -1 else (mtime_ns, size)
+        entries.append((relative_path, code_point, dir_flavors[dir_flavor_index], name_flavors, bitmap, stat_key))
+    return defined_dir_flavors, defined_name_flavors, entries
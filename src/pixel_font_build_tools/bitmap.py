@@ -0,0 +1,46 @@
+import os
+
+from pixel_font_build_tools.utils import glyph_util
+
+
+class GlyphBitmap:
+    __slots__ = ('width', 'height', 'packed')
+
+    @staticmethod
+    def from_glyph_data(data: list[list[int]]) -> 'GlyphBitmap':
+        width = len(data[0]) if len(data) > 0 else 0
+        return GlyphBitmap(width, len(data), glyph_util.pack_glyph_data(data))
+
+    @staticmethod
+    def load_png(file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes]) -> 'GlyphBitmap':
+        packed, width, height = glyph_util.load_packed_glyph_data_from_png(file_path)
+        return GlyphBitmap(width, height, packed)
+
+    def __init__(self, width: int, height: int, packed: bytes):
+        self.width = width
+        self.height = height
+        self.packed = packed
+
+    def __reduce__(self) -> tuple:
+        return GlyphBitmap, (self.width, self.height, bytes(self.packed))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GlyphBitmap):
+            return NotImplemented
+        return self.width == other.width and self.height == other.height and self.packed == other.packed
+
+    def __hash__(self) -> int:
+        return hash((self.width, self.height, self.packed))
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def to_glyph_data(self) -> list[list[int]]:
+        return glyph_util.unpack_glyph_data(self.packed, self.width, self.height)
+
+    def encode_png(self) -> bytes:
+        return glyph_util.encode_packed_glyph_data_to_png(self.packed, self.width, self.height)
+
+    def save_png(self, file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes]):
+        glyph_util.save_packed_glyph_data_to_png(self.packed, self.width, self.height, file_path)
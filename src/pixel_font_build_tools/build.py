@@ -0,0 +1,236 @@
+import functools
+import hashlib
+import importlib.metadata
+import itertools
+import logging
+import os
+import shutil
+from collections.abc import Callable
+from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
+
+from pixel_font_builder import FontBuilder, FontCollectionBuilder, Glyph
+from pixel_font_builder.opentype import Flavor
+
+from pixel_font_build_tools import profiling
+from pixel_font_build_tools.context import DesignContext
+from pixel_font_build_tools.utils import fs_util
+
+logger = logging.getLogger('pixel_font_build_tools.build')
+
+CreateBuilder = Callable[[DesignContext, dict[str, Glyph], str, str, bool], FontBuilder]
+
+font_formats = ['otf', 'woff', 'woff2', 'ttf', 'bdf']
+font_collection_formats = ['otc', 'ttc']
+
+
+class FontTarget:
+    def __init__(
+            self,
+            file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+            font_format: str,
+            dir_flavor: str = 'common',
+            name_flavor: str = '',
+    ):
+        assert font_format in font_formats, f"Unsupported font format: '{font_format}'"
+        self.file_path = file_path
+        self.font_format = font_format
+        self.dir_flavor = dir_flavor
+        self.name_flavor = name_flavor
+
+    @property
+    def group_key(self) -> tuple[str, str, tuple[str, ...]]:
+        return 'font', self.dir_flavor, (self.name_flavor,)
+
+
+class FontCollectionTarget:
+    def __init__(
+            self,
+            file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+            font_format: str,
+            dir_flavor: str = 'common',
+            name_flavors: list[str] = None,
+    ):
+        assert font_format in font_collection_formats, f"Unsupported font collection format: '{font_format}'"
+        if name_flavors is None:
+            name_flavors = []
+        self.file_path = file_path
+        self.font_format = font_format
+        self.dir_flavor = dir_flavor
+        self.name_flavors = name_flavors
+
+    @property
+    def group_key(self) -> tuple[str, str, tuple[str, ...]]:
+        return 'collection', self.dir_flavor, tuple(self.name_flavors)
+
+
+@functools.cache
+def _get_library_versions() -> tuple[tuple[str, str], ...]:
+    versions = []
+    for distribution_name in ['pixel-font-build-tools', 'pixel-font-builder', 'fonttools', 'bdffont', 'brotli']:
+        try:
+            version = importlib.metadata.version(distribution_name)
+        except importlib.metadata.PackageNotFoundError:
+            version = None
+        versions.append((distribution_name, version))
+    return tuple(versions)
+
+
+def _update_fingerprint(hasher, value: object):
+    if value is None or isinstance(value, str | int | float | Enum):
+        hasher.update(repr(value).encode())
+    elif isinstance(value, Glyph):
+        hasher.update(repr((value.name, value.advance_width, value.advance_height, value.horizontal_origin, value.vertical_origin_y, [len(data_row) for data_row in value.data])).encode())
+        hasher.update(bytes(map(bool, itertools.chain.from_iterable(value.data))))
+    elif isinstance(value, list | tuple):
+        hasher.update(f'[{len(value)}'.encode())
+        for item in value:
+            _update_fingerprint(hasher, item)
+        hasher.update(b']')
+    elif isinstance(value, dict):
+        hasher.update(repr(sorted(value.items())).encode())
+    elif hasattr(value, '__dict__'):
+        hasher.update(type(value).__qualname__.encode())
+        for name, item in sorted(vars(value).items()):
+            hasher.update(name.encode())
+            _update_fingerprint(hasher, item)
+    else:
+        hasher.update(repr(value).encode())
+
+
+def _create_fingerprint(builders: list[FontBuilder]) -> str:
+    hasher = hashlib.sha256()
+    hasher.update(repr(_get_library_versions()).encode())
+    _update_fingerprint(hasher, builders)
+    return hasher.hexdigest()
+
+
+def _make_target(
+        target: FontTarget | FontCollectionTarget,
+        fingerprint: str | None,
+        cache_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes] | None,
+        save: Callable[[], None],
+):
+    if cache_dir is None:
+        save()
+        return
+
+    cached_file_path = os.path.join(cache_dir, f'{fingerprint}.{target.font_format}')
+    if os.path.isfile(cached_file_path):
+        profiling.count('build.artifact_cache.hit')
+        shutil.copyfile(cached_file_path, target.file_path)
+        logger.info("Reuse cached file: '%s'", target.file_path)
+    else:
+        profiling.count('build.artifact_cache.miss')
+        save()
+        temp_file_path = f'{cached_file_path}.{os.getpid()}.tmp'
+        shutil.copyfile(target.file_path, temp_file_path)
+        os.replace(temp_file_path, cached_file_path)
+
+
+def _save_font(builder: FontBuilder, target: FontTarget):
+    if target.font_format == 'otf':
+        builder.save_otf(target.file_path)
+    elif target.font_format == 'woff':
+        builder.save_otf(target.file_path, flavor=Flavor.WOFF)
+    elif target.font_format == 'woff2':
+        builder.save_otf(target.file_path, flavor=Flavor.WOFF2)
+    elif target.font_format == 'ttf':
+        builder.save_ttf(target.file_path)
+    elif target.font_format == 'bdf':
+        builder.save_bdf(target.file_path)
+    logger.info("Make font file: '%s'", target.file_path)
+
+
+def _save_font_collection(collection_builder: FontCollectionBuilder, target: FontCollectionTarget):
+    if target.font_format == 'otc':
+        collection_builder.save_otc(target.file_path)
+    elif target.font_format == 'ttc':
+        collection_builder.save_ttc(target.file_path)
+    logger.info("Make font collection file: '%s'", target.file_path)
+
+
+def _build_group(
+        context: DesignContext,
+        create_builder: CreateBuilder,
+        cache_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes] | None,
+        dir_flavor_to_glyph_cacher: dict[str, dict[str, Glyph]],
+        targets: list[FontTarget | FontCollectionTarget],
+):
+    kind, dir_flavor, name_flavors = targets[0].group_key
+    glyph_cacher = dir_flavor_to_glyph_cacher.setdefault(dir_flavor, {})
+    if kind == 'font':
+        builder = create_builder(context, glyph_cacher, dir_flavor, name_flavors[0], False)
+        fingerprint = _create_fingerprint([builder]) if cache_dir is not None else None
+        for target in targets:
+            _make_target(target, fingerprint, cache_dir, functools.partial(_save_font, builder, target))
+    else:
+        collection_builder = FontCollectionBuilder()
+        for name_flavor in name_flavors:
+            collection_builder.font_builders.append(create_builder(context, glyph_cacher, dir_flavor, name_flavor, True))
+        fingerprint = _create_fingerprint(collection_builder.font_builders) if cache_dir is not None else None
+        for target in targets:
+            _make_target(target, fingerprint, cache_dir, functools.partial(_save_font_collection, collection_builder, target))
+
+
+_worker_context: DesignContext | None = None
+_worker_create_builder: CreateBuilder | None = None
+_worker_cache_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes] | None = None
+_worker_dir_flavor_to_glyph_cacher: dict[str, dict[str, Glyph]] = {}
+
+
+def _init_worker(
+        context: DesignContext,
+        create_builder: CreateBuilder,
+        cache_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes] | None,
+):
+    global _worker_context, _worker_create_builder, _worker_cache_dir
+    _worker_context = context
+    _worker_create_builder = create_builder
+    _worker_cache_dir = cache_dir
+    _worker_dir_flavor_to_glyph_cacher.clear()
+
+
+def _build_group_in_worker(targets: list[FontTarget | FontCollectionTarget]):
+    _build_group(_worker_context, _worker_create_builder, _worker_cache_dir, _worker_dir_flavor_to_glyph_cacher, targets)
+
+
+def build_fonts(
+        context: DesignContext,
+        targets: list[FontTarget | FontCollectionTarget],
+        create_builder: CreateBuilder,
+        workers: int = 1,
+        cache_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes] = None,
+):
+    if cache_dir is not None:
+        fs_util.make_dirs(cache_dir)
+
+    groups: dict[tuple[str, str, tuple[str, ...]], list[FontTarget | FontCollectionTarget]] = {}
+    for target in targets:
+        groups.setdefault(target.group_key, []).append(target)
+
+    # Decode every bitmap in this process first, so the workers inherit them instead of decoding them again.
+    # Shared bitmaps are pickled once when the context is sent to the workers.
+    with profiling.stage('build.decode'):
+        dir_flavor_to_name_flavors = {}
+        for target in targets:
+            name_flavors = dir_flavor_to_name_flavors.setdefault(target.dir_flavor, [])
+            for name_flavor in [target.name_flavor] if isinstance(target, FontTarget) else target.name_flavors:
+                if name_flavor not in name_flavors:
+                    name_flavors.append(name_flavor)
+        for dir_flavor, name_flavors in dir_flavor_to_name_flavors.items():
+            for glyph_file in context.get_glyph_files(dir_flavor, name_flavors):
+                if not glyph_file.is_glyph_data_loaded:
+                    glyph_file.load_glyph_data()
+        context.deduplicate_glyph_bitmaps()
+
+    with profiling.stage('build.fonts'):
+        if workers > 1 and len(groups) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context, create_builder, cache_dir)) as executor:
+                for _ in executor.map(_build_group_in_worker, groups.values()):
+                    pass
+        else:
+            dir_flavor_to_glyph_cacher = {}
+            for group_targets in groups.values():
+                _build_group(context, create_builder, cache_dir, dir_flavor_to_glyph_cacher, group_targets)
+    profiling.count('build.targets', len(targets))
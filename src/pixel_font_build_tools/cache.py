@@ -0,0 +1,75 @@
+import os
+import sqlite3
+
+from pixel_font_build_tools.bitmap import GlyphBitmap
+from pixel_font_build_tools.utils import fs_util
+
+_SCHEMA_VERSION = 1
+
+
+class GlyphCache:
+    def __init__(self, cache_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes]):
+        fs_util.make_dirs(cache_dir)
+        self.cache_dir = cache_dir
+        self._connection = sqlite3.connect(os.path.join(cache_dir, 'glyphs.sqlite3'))
+        schema_version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+        if schema_version != _SCHEMA_VERSION:
+            self._connection.execute('DROP TABLE IF EXISTS glyph')
+            self._connection.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS glyph (file_path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, width INTEGER, height INTEGER, bitmap BLOB)')
+        self._connection.execute('CREATE TEMP TABLE requested_glyph (file_path TEXT PRIMARY KEY)')
+        self._file_path_to_stat: dict[str, tuple[int, int]] = {}
+
+    def __enter__(self) -> 'GlyphCache':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def restore_glyph_files(self, glyph_files: list) -> list:
+        # Only the rows of the requested paths are read, through a join with a temp table of those paths.
+        file_paths = [os.path.abspath(glyph_file.file_path) for glyph_file in glyph_files]
+        with self._connection:
+            self._connection.execute('DELETE FROM requested_glyph')
+            self._connection.executemany('INSERT OR IGNORE INTO requested_glyph VALUES (?)', [(file_path,) for file_path in file_paths])
+        entries = {}
+        for file_path, mtime_ns, size, width, height, packed in self._connection.execute('SELECT file_path, mtime_ns, size, width, height, bitmap FROM glyph JOIN requested_glyph USING (file_path)'):
+            entries[file_path] = mtime_ns, size, width, height, packed
+
+        missed_glyph_files = []
+        for glyph_file, file_path in zip(glyph_files, file_paths):
+            file_stat = glyph_file.file_stat
+            if file_stat is None:
+                file_stat = os.stat(file_path)
+                glyph_file.file_stat = file_stat
+            self._file_path_to_stat[file_path] = file_stat.st_mtime_ns, file_stat.st_size
+            entry = entries.get(file_path, None)
+            if entry is not None and entry[0] == file_stat.st_mtime_ns and entry[1] == file_stat.st_size:
+                _, _, width, height, packed = entry
+                glyph_file.restore_glyph_bitmap(GlyphBitmap(width, height, packed))
+            else:
+                missed_glyph_files.append(glyph_file)
+        return missed_glyph_files
+
+    def store_glyph_files(self, glyph_files: list):
+        rows = []
+        for glyph_file in glyph_files:
+            file_path = os.path.abspath(glyph_file.file_path)
+            mtime_ns, size = self._file_path_to_stat[file_path]
+            glyph_bitmap = glyph_file.glyph_bitmap
+            rows.append((file_path, mtime_ns, size, glyph_bitmap.width, glyph_bitmap.height, glyph_bitmap.packed))
+        with self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO glyph VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    def prune_glyph_files(self, root_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes]) -> int:
+        # Drops the rows under the root dir that the last restore did not ask for, which are deleted or renamed files.
+        dir_prefix = os.path.join(os.path.abspath(root_dir), '')
+        with self._connection:
+            cursor = self._connection.execute(
+                'DELETE FROM glyph WHERE substr(file_path, 1, length(?1)) = ?1 AND file_path NOT IN (SELECT file_path FROM requested_glyph)',
+                (dir_prefix,),
+            )
+        return cursor.rowcount
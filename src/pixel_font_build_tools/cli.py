@@ -0,0 +1,137 @@
+import argparse
+import importlib
+import logging
+import os
+import sys
+
+# Heavy modules ('context', 'build', 'png', 'unidata_blocks', 'pixel_font_builder') are imported inside the commands that use them,
+# so starting the CLI only costs what the chosen command needs.
+
+
+def _add_flavor_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('root_dir', help='root directory of the glyph files')
+    parser.add_argument('--dir-flavors', nargs='*', default=[], help='defined dir flavors')
+    parser.add_argument('--name-flavors', nargs='*', default=[], help='defined name flavors')
+
+
+def _add_fallback_argument(parser: argparse.ArgumentParser):
+    parser.add_argument('--fallback-default-name-flavor', action='store_true', help='use the first defined name flavor as default where no default exists')
+
+
+def _load_context(args: argparse.Namespace, **kwargs):
+    from pixel_font_build_tools.context import DesignContext
+
+    if getattr(args, 'archive', None) is not None:
+        context = DesignContext.load_archive(args.archive, args.root_dir)
+    else:
+        context = DesignContext.load(args.root_dir, defined_dir_flavors=args.dir_flavors, defined_name_flavors=args.name_flavors, **kwargs)
+    if getattr(args, 'fallback_default_name_flavor', False):
+        context.fallback_default_name_flavor()
+    return context
+
+
+def _run_validate(args: argparse.Namespace) -> int:
+    from pixel_font_build_tools import validation
+
+    errors = validation.validate_glyph_files(
+        args.root_dir,
+        args.dir_flavors,
+        args.name_flavors,
+        fallback_default_name_flavor=args.fallback_default_name_flavor,
+        check_png_headers=args.check_png_headers,
+    )
+    for error in errors:
+        print(error)
+    return 1 if len(errors) > 0 else 0
+
+
+def _run_standardize(args: argparse.Namespace) -> int:
+    context = _load_context(args, lazy=True)
+    rewritten_file_paths, fixed_file_paths = context.standardize_glyph_files(workers=args.workers, dry_run=args.dry_run)
+    for old_file_path, file_path in fixed_file_paths.items():
+        print(f"Rename: '{old_file_path}' -> '{file_path}'")
+    for file_path in rewritten_file_paths:
+        print(f"Rewrite: '{file_path}'")
+    return 1 if args.dry_run and (len(rewritten_file_paths) > 0 or len(fixed_file_paths) > 0) else 0
+
+
+def _run_stats(args: argparse.Namespace) -> int:
+    context = _load_context(args, lazy=True)
+    print(f'glyph files: {len(context.path_to_glyph_file)}')
+    print(f'code points: {len(context.code_point_to_glyph_info)}')
+    for dir_flavor in ['common', *context.defined_dir_flavors]:
+        print(f'{dir_flavor}: {len(context.get_alphabet(dir_flavor))} characters, {len(context.get_glyph_files(dir_flavor))} glyph files')
+    return 0
+
+
+def _load_create_builder(spec: str):
+    module_name, _, function_name = spec.partition(':')
+    assert function_name != '', f"Builder not in 'module:function' form: '{spec}'"
+    # Console scripts do not put the working directory on 'sys.path', so project local builders could not be found otherwise.
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _run_build(args: argparse.Namespace) -> int:
+    from pixel_font_build_tools.build import FontTarget, FontCollectionTarget, build_fonts
+    from pixel_font_build_tools.utils import fs_util
+
+    create_builder = _load_create_builder(args.builder)
+    context = _load_context(args, workers=args.workers, cache_dir=args.glyph_cache_dir)
+    file_name_prefix = '' if args.font_name is None else f'{args.font_name}-'
+
+    fs_util.make_dirs(args.outputs_dir)
+    targets = []
+    for dir_flavor in context.defined_dir_flavors or ['common']:
+        for name_flavor in context.defined_name_flavors or ['']:
+            file_name = f'{file_name_prefix}{dir_flavor}' if name_flavor == '' else f'{file_name_prefix}{dir_flavor}-{name_flavor}'
+            for font_format in args.formats:
+                targets.append(FontTarget(os.path.join(args.outputs_dir, f'{file_name}.{font_format}'), font_format, dir_flavor, name_flavor))
+        if len(context.defined_name_flavors) > 0:
+            for font_format in args.collection_formats:
+                targets.append(FontCollectionTarget(os.path.join(args.outputs_dir, f'{file_name_prefix}{dir_flavor}.{font_format}'), font_format, dir_flavor, context.defined_name_flavors))
+    build_fonts(context, targets, create_builder, workers=args.workers, cache_dir=args.cache_dir)
+    return 0
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='pixel-font-build-tools', description='A set of tools for building pixel fonts.')
+    parser.add_argument('--verbose', action='store_true', help='show debug logs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    validate_parser = subparsers.add_parser('validate', help='check glyph file names and flavors without decoding them')
+    _add_flavor_arguments(validate_parser)
+    _add_fallback_argument(validate_parser)
+    validate_parser.add_argument('--check-png-headers', action='store_true', help='also check the PNG header of every glyph file')
+    validate_parser.set_defaults(run=_run_validate)
+
+    standardize_parser = subparsers.add_parser('standardize', help='move glyph files into block directories and rewrite them')
+    _add_flavor_arguments(standardize_parser)
+    standardize_parser.add_argument('--workers', type=int, default=None, help='threads for rewriting glyph files')
+    standardize_parser.add_argument('--dry-run', action='store_true', help='only print the plan, and exit with 1 if anything would change')
+    standardize_parser.set_defaults(run=_run_standardize)
+
+    stats_parser = subparsers.add_parser('stats', help='print glyph counts per dir flavor')
+    _add_flavor_arguments(stats_parser)
+    _add_fallback_argument(stats_parser)
+    stats_parser.add_argument('--archive', help='load from a glyph archive instead of the glyph files')
+    stats_parser.set_defaults(run=_run_stats)
+
+    build_parser = subparsers.add_parser('build', help='build fonts for every dir flavor and name flavor')
+    _add_flavor_arguments(build_parser)
+    _add_fallback_argument(build_parser)
+    build_parser.add_argument('outputs_dir', help='directory of the built fonts')
+    build_parser.add_argument('--builder', required=True, help="function creating a font builder, in 'module:function' form")
+    build_parser.add_argument('--font-name', help='prefix of the output file names')
+    build_parser.add_argument('--formats', nargs='*', default=['otf', 'woff2', 'ttf', 'bdf'], help='font formats')
+    build_parser.add_argument('--collection-formats', nargs='*', default=['otc', 'ttc'], help='font collection formats')
+    build_parser.add_argument('--archive', help='load from a glyph archive instead of the glyph files')
+    build_parser.add_argument('--workers', type=int, default=1, help='processes for decoding and building')
+    build_parser.add_argument('--glyph-cache-dir', help='directory of the decoded glyph cache')
+    build_parser.add_argument('--cache-dir', help='directory of the built font cache')
+    build_parser.set_defaults(run=_run_build)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    return args.run(args)
@@ -1,9 +1,17 @@
+import bisect
+import functools
 import logging
 import os
-from collections import defaultdict
-
-import unidata_blocks
-
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from pixel_font_build_tools import archive, profiling
+from pixel_font_build_tools.bitmap import GlyphBitmap
+from pixel_font_build_tools.cache import GlyphCache
 from pixel_font_build_tools.utils import glyph_util, fs_util
 
 logger = logging.getLogger('pixel_font_build_tools.context')
@@ -15,21 +23,46 @@ class GlyphFile:
             file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
             dir_flavor: str,
             defined_name_flavors: list[str],
+            lazy: bool = False,
+            file_stat: os.stat_result = None,
     ) -> 'GlyphFile':
+        code_point, name_flavors = GlyphFile.parse_file_name(file_path, defined_name_flavors)
+        return GlyphFile(file_path, code_point, dir_flavor, name_flavors, lazy, file_stat)
+
+    @staticmethod
+    def parse_file_name(
+            file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+            defined_name_flavors: list[str],
+    ) -> tuple[int, list[str]]:
         assert file_path.endswith('.png'), f"Glyph file not a '.png' file: '{file_path}'"
+        code_point, name_flavors, errors = GlyphFile.try_parse_file_name(file_path, defined_name_flavors)
+        if code_point is None:
+            raise ValueError(errors[0])
+        assert len(errors) == 0, errors[0]
+        return code_point, name_flavors
 
+    @staticmethod
+    def try_parse_file_name(
+            file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+            defined_name_flavors: list[str],
+    ) -> tuple[int | None, list[str], list[str]]:
+        # Collects the errors instead of failing on the first, and leaves out undefined name flavors. The code point is None when it is invalid.
+        errors = []
         tokens = os.path.basename(file_path).removesuffix('.png').split(' ', 1)
-        code_point = glyph_util.hex_name_to_code_point(tokens[0].strip())
+        try:
+            code_point = glyph_util.hex_name_to_code_point(tokens[0].strip())
+        except ValueError:
+            return None, [], [f"Glyph file invalid code point: '{file_path}'"]
         name_flavors = []
         if len(tokens) == 2:
             for name_flavor in tokens[1].split(','):
                 name_flavor = name_flavor.lower().strip()
-                assert name_flavor in defined_name_flavors, f"Glyph file undefined name flavor '{name_flavor}': '{file_path}'"
-                if name_flavor not in name_flavors:
+                if name_flavor not in defined_name_flavors:
+                    errors.append(f"Glyph file undefined name flavor '{name_flavor}': '{file_path}'")
+                elif name_flavor not in name_flavors:
                     name_flavors.append(name_flavor)
             name_flavors.sort(key=lambda x: defined_name_flavors.index(x))
-
-        return GlyphFile(file_path, code_point, dir_flavor, name_flavors)
+        return code_point, name_flavors, errors
 
     def __init__(
             self,
@@ -37,12 +70,115 @@ class GlyphFile:
             code_point: int,
             dir_flavor: str,
             name_flavors: list[str],
+            lazy: bool = False,
+            file_stat: os.stat_result = None,
     ):
         self.file_path = file_path
         self.code_point = code_point
         self.dir_flavor = dir_flavor
         self.name_flavors = name_flavors
-        self.glyph_data, self.glyph_width, self.glyph_height = glyph_util.load_glyph_data_from_png(file_path)
+        self.file_stat = file_stat
+        self._glyph_bitmap: GlyphBitmap | None = None
+        self._glyph_size: tuple[int, int] | None = None
+        self._glyph_data: list[list[int]] | None = None
+        self._is_glyph_bitmap_from_file = False
+        if not lazy:
+            self.load_glyph_data()
+
+    def load_glyph_data(self):
+        if self.file_stat is None:
+            self.file_stat = os.stat(self.file_path)
+        if profiling.is_active():
+            start_time = time.perf_counter()
+            self.glyph_bitmap = GlyphBitmap.load_png(self.file_path)
+            profiling.record_glyph_decode(self.file_path, time.perf_counter() - start_time)
+        else:
+            self.glyph_bitmap = GlyphBitmap.load_png(self.file_path)
+        self._is_glyph_bitmap_from_file = True
+
+    def restore_glyph_bitmap(self, glyph_bitmap: GlyphBitmap):
+        # For a bitmap decoded elsewhere, such as by a worker, a cache or an archive, from the file as it was at 'file_stat'.
+        self.glyph_bitmap = glyph_bitmap
+        self._is_glyph_bitmap_from_file = True
+
+    def _sync_glyph_data(self):
+        # In-place edits of the list returned by 'glyph_data' are packed back before the bitmap is used.
+        if self._glyph_data is not None:
+            glyph_bitmap = GlyphBitmap.from_glyph_data(self._glyph_data)
+            if glyph_bitmap != self._glyph_bitmap:
+                self._glyph_bitmap = glyph_bitmap
+                self._glyph_size = glyph_bitmap.size
+                self._is_glyph_bitmap_from_file = False
+
+    def release_glyph_data(self) -> bool:
+        # Only a bitmap decoded from the file as-is can be dropped, since it can be decoded again on demand.
+        self._sync_glyph_data()
+        if not self._is_glyph_bitmap_from_file:
+            return False
+        self._glyph_bitmap = None
+        self._glyph_data = None
+        self._is_glyph_bitmap_from_file = False
+        return True
+
+    @property
+    def is_glyph_data_loaded(self) -> bool:
+        return self._glyph_bitmap is not None
+
+    @property
+    def is_glyph_bitmap_from_file(self) -> bool:
+        self._sync_glyph_data()
+        return self._glyph_bitmap is not None and self._is_glyph_bitmap_from_file
+
+    @property
+    def is_glyph_bitmap_outdated(self) -> bool:
+        # A bitmap from the file no longer matches it once the file changed after 'file_stat', or when that stat is unknown.
+        # Bitmaps set in memory are edits, so they are never outdated.
+        if not self.is_glyph_bitmap_from_file:
+            return False
+        return self.file_stat is None or _get_stat_key(os.stat(self.file_path)) != _get_stat_key(self.file_stat)
+
+    @property
+    def glyph_bitmap(self) -> GlyphBitmap:
+        if self._glyph_bitmap is None:
+            self.load_glyph_data()
+        else:
+            self._sync_glyph_data()
+        return self._glyph_bitmap
+
+    @glyph_bitmap.setter
+    def glyph_bitmap(self, value: GlyphBitmap):
+        self._glyph_bitmap = value
+        self._glyph_size = value.size
+        self._glyph_data = None
+        self._is_glyph_bitmap_from_file = False
+
+    @property
+    def glyph_data(self) -> list[list[int]]:
+        if self._glyph_data is None:
+            self._glyph_data = self.glyph_bitmap.to_glyph_data()
+        return self._glyph_data
+
+    @glyph_data.setter
+    def glyph_data(self, value: list[list[int]]):
+        self.glyph_bitmap = GlyphBitmap.from_glyph_data(value)
+        self._glyph_data = value
+
+    @property
+    def glyph_size(self) -> tuple[int, int]:
+        # Read from the unpacked list when there is one, since repacking it just for the size costs a pass over every pixel.
+        if self._glyph_data is not None:
+            return len(self._glyph_data[0]) if len(self._glyph_data) > 0 else 0, len(self._glyph_data)
+        if self._glyph_size is None:
+            self._glyph_size = glyph_util.load_glyph_size_from_png(self.file_path)
+        return self._glyph_size
+
+    @property
+    def glyph_width(self) -> int:
+        return self.glyph_size[0]
+
+    @property
+    def glyph_height(self) -> int:
+        return self.glyph_size[1]
 
     @property
     def glyph_name(self) -> str:
@@ -54,8 +190,19 @@ class GlyphFile:
             glyph_name = f'{glyph_name}-{self.name_flavors[0]}'
         return glyph_name
 
-    def save(self):
-        glyph_util.save_glyph_data_to_png(self.glyph_data, self.file_path)
+    def save(self, force: bool = True, dry_run: bool = False) -> bool:
+        png_bytes = self.glyph_bitmap.encode_png()
+        if not force:
+            with open(self.file_path, 'rb') as file:
+                if file.read() == png_bytes:
+                    return False
+        if dry_run:
+            return True
+        with open(self.file_path, 'wb') as file:
+            file.write(png_bytes)
+        self.file_stat = os.stat(self.file_path)
+        self._is_glyph_bitmap_from_file = True
+        return True
 
 
 class GlyphInfo:
@@ -64,14 +211,25 @@ class GlyphInfo:
         self._dir_flavor_registry: dict[str, dict[str, GlyphFile]] = defaultdict(dict)
 
     def add_glyph_file(self, glyph_file: GlyphFile):
+        errors = self.try_add_glyph_file(glyph_file)
+        assert len(errors) == 0, errors[0]
+
+    def try_add_glyph_file(self, glyph_file: GlyphFile) -> list[str]:
+        # Registers the name flavors that are still free, and collects an error for each one that is taken.
+        errors = []
         name_flavor_registry = self._dir_flavor_registry[glyph_file.dir_flavor]
         if len(glyph_file.name_flavors) == 0:
-            assert '' not in name_flavor_registry, f"Glyph file default name flavor already exists:\n'{glyph_file.file_path}'\n'{name_flavor_registry[''].file_path}'"
-            name_flavor_registry[''] = glyph_file
+            if '' in name_flavor_registry:
+                errors.append(f"Glyph file default name flavor already exists:\n'{glyph_file.file_path}'\n'{name_flavor_registry[''].file_path}'")
+            else:
+                name_flavor_registry[''] = glyph_file
         else:
             for name_flavor in glyph_file.name_flavors:
-                assert name_flavor not in name_flavor_registry, f"Glyph file name flavor '{name_flavor}' already exists:\n'{glyph_file.file_path}'\n'{name_flavor_registry[name_flavor].file_path}'"
-                name_flavor_registry[name_flavor] = glyph_file
+                if name_flavor in name_flavor_registry:
+                    errors.append(f"Glyph file name flavor '{name_flavor}' already exists:\n'{glyph_file.file_path}'\n'{name_flavor_registry[name_flavor].file_path}'")
+                else:
+                    name_flavor_registry[name_flavor] = glyph_file
+        return errors
 
     def fallback_default_name_flavor(self, defined_name_flavors: list[str]):
         for name_flavor_registry in self._dir_flavor_registry.values():
@@ -86,6 +244,14 @@ class GlyphInfo:
                     name_flavor_registry[''] = glyph_file
                     break
 
+    def get_glyph_files(self) -> list[GlyphFile]:
+        glyph_files = []
+        for name_flavor_registry in self._dir_flavor_registry.values():
+            for glyph_file in name_flavor_registry.values():
+                if glyph_file not in glyph_files:
+                    glyph_files.append(glyph_file)
+        return glyph_files
+
     def query_by_dir_flavor(self, dir_flavor: str = 'common') -> dict[str, GlyphFile] | None:
         if dir_flavor in self._dir_flavor_registry:
             return self._dir_flavor_registry[dir_flavor]
@@ -94,6 +260,88 @@ class GlyphInfo:
         else:
             return None
 
+    def resolve(self, dir_flavor: str, name_flavor: str) -> GlyphFile | None:
+        name_flavor_registry = self.query_by_dir_flavor(dir_flavor)
+        if name_flavor_registry is None:
+            return None
+        return name_flavor_registry.get(name_flavor, name_flavor_registry.get('', None))
+
+
+def _scan_glyph_files(
+        root_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+        defined_dir_flavors: list[str],
+) -> list[tuple[str, str, os.stat_result]]:
+    file_infos = []
+    with os.scandir(root_dir) as dir_flavor_entries:
+        dir_flavor_entries = [entry for entry in dir_flavor_entries if entry.is_dir()]
+    for dir_flavor_entry in dir_flavor_entries:
+        dir_flavor = dir_flavor_entry.name
+        if dir_flavor != 'common':
+            assert dir_flavor in defined_dir_flavors, f"Undefined dir flavor: '{dir_flavor}'"
+        for _, _, file_entries in fs_util.scan_dir(dir_flavor_entry.path):
+            for file_entry in file_entries:
+                if not file_entry.name.endswith('.png'):
+                    continue
+                file_infos.append((file_entry.path, dir_flavor, file_entry.stat()))
+    return file_infos
+
+
+def _get_stat_key(file_stat: os.stat_result) -> tuple[int, int]:
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def _create_file_stat(stat_key: tuple[int, int]) -> os.stat_result:
+    # Only the fields of the stat key are filled in, which is all that is compared.
+    mtime_ns, size = stat_key
+    return os.stat_result((0, 0, 0, 0, 0, 0, size, 0, mtime_ns // 1_000_000_000, 0), {'st_mtime_ns': mtime_ns})
+
+
+@functools.cache
+def _get_block_table() -> tuple[list[int], list['unidata_blocks.UnicodeBlock']]:
+    # Imported here since loading the block data is slow, and only standardizing needs it.
+    import unidata_blocks
+
+    blocks = sorted(unidata_blocks.get_blocks(), key=lambda block: block.code_start)
+    return [block.code_start for block in blocks], blocks
+
+
+def _get_block_by_code_point(code_point: int) -> 'unidata_blocks.UnicodeBlock | None':
+    code_starts, blocks = _get_block_table()
+    index = bisect.bisect_right(code_starts, code_point) - 1
+    if index >= 0 and code_point <= blocks[index].code_end:
+        return blocks[index]
+    return None
+
+
+def _register_glyph_file(
+        code_point_to_glyph_info: dict[int, GlyphInfo],
+        path_to_glyph_file: dict[str, GlyphFile],
+        glyph_file: GlyphFile,
+):
+    code_point = glyph_file.code_point
+    if code_point in code_point_to_glyph_info:
+        glyph_info = code_point_to_glyph_info[code_point]
+    else:
+        glyph_info = GlyphInfo(code_point)
+        code_point_to_glyph_info[code_point] = glyph_info
+    glyph_info.add_glyph_file(glyph_file)
+    path_to_glyph_file[str(glyph_file.file_path)] = glyph_file
+
+
+def _load_glyph_files_data(glyph_files: list[GlyphFile], workers: int):
+    if workers > 1 and len(glyph_files) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        file_paths = [glyph_file.file_path for glyph_file in glyph_files]
+        chunk_size = max(1, len(file_paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            glyph_bitmaps = executor.map(GlyphBitmap.load_png, file_paths, chunksize=chunk_size)
+            for glyph_file, glyph_bitmap in zip(glyph_files, glyph_bitmaps):
+                glyph_file.restore_glyph_bitmap(glyph_bitmap)
+    else:
+        for glyph_file in glyph_files:
+            glyph_file.load_glyph_data()
+
 
 class DesignContext:
     @staticmethod
@@ -101,36 +349,81 @@ class DesignContext:
             root_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes],
             defined_dir_flavors: list[str] = None,
             defined_name_flavors: list[str] = None,
+            workers: int = 1,
+            lazy: bool = False,
+            cache_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes] = None,
     ) -> 'DesignContext':
         if defined_dir_flavors is None:
             defined_dir_flavors = []
         if defined_name_flavors is None:
             defined_name_flavors = []
 
+        with profiling.stage('load.scan'):
+            file_infos = _scan_glyph_files(root_dir, defined_dir_flavors)
+        profiling.count('load.files_scanned', len(file_infos))
+
         code_point_to_glyph_info = {}
         path_to_glyph_file = {}
+        with profiling.stage('load.register'):
+            for file_path, dir_flavor, file_stat in file_infos:
+                glyph_file = GlyphFile.load(file_path, dir_flavor, defined_name_flavors, lazy=True, file_stat=file_stat)
+                _register_glyph_file(code_point_to_glyph_info, path_to_glyph_file, glyph_file)
+
+        glyph_files = list(path_to_glyph_file.values())
+        if cache_dir is not None:
+            with GlyphCache(cache_dir) as cache:
+                with profiling.stage('load.cache_restore'):
+                    missed_glyph_files = cache.restore_glyph_files(glyph_files)
+                    profiling.count('load.glyph_cache.pruned', cache.prune_glyph_files(root_dir))
+                profiling.count('load.glyph_cache.hit', len(glyph_files) - len(missed_glyph_files))
+                profiling.count('load.glyph_cache.miss', len(missed_glyph_files))
+                glyph_files = missed_glyph_files
+                if not lazy:
+                    with profiling.stage('load.decode'):
+                        _load_glyph_files_data(glyph_files, workers)
+                    with profiling.stage('load.cache_store'):
+                        cache.store_glyph_files(glyph_files)
+        elif not lazy:
+            with profiling.stage('load.decode'):
+                _load_glyph_files_data(glyph_files, workers)
+        if not lazy:
+            profiling.count('load.bytes_read', sum(glyph_file.file_stat.st_size for glyph_file in glyph_files))
+
+        context = DesignContext(
+            root_dir,
+            defined_dir_flavors,
+            defined_name_flavors,
+            code_point_to_glyph_info,
+            path_to_glyph_file,
+        )
+        with profiling.stage('load.deduplicate'):
+            context.deduplicate_glyph_bitmaps()
+        return context
 
-        for dir_flavor in os.listdir(root_dir):
-            dir_flavor_path = os.path.join(root_dir, dir_flavor)
-            if not os.path.isdir(dir_flavor_path):
-                continue
-            if dir_flavor != 'common':
-                assert dir_flavor in defined_dir_flavors, f"Undefined dir flavor: '{dir_flavor}'"
-            for file_dir, _, file_names in os.walk(dir_flavor_path):
-                for file_name in file_names:
-                    if not file_name.endswith('.png'):
-                        continue
-                    file_path = os.path.join(file_dir, file_name)
-                    glyph_file = GlyphFile.load(file_path, dir_flavor, defined_name_flavors)
-                    code_point = glyph_file.code_point
-                    if code_point in code_point_to_glyph_info:
-                        glyph_info = code_point_to_glyph_info[code_point]
-                    else:
-                        glyph_info = GlyphInfo(code_point)
-                        code_point_to_glyph_info[code_point] = glyph_info
-                    glyph_info.add_glyph_file(glyph_file)
-                    path_to_glyph_file[str(glyph_file.file_path)] = glyph_file
+    @staticmethod
+    def load_archive(
+            file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+            root_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes] = None,
+    ) -> 'DesignContext':
+        with profiling.stage('load.archive'):
+            defined_dir_flavors, defined_name_flavors, entries = archive.load_archive(file_path)
+        profiling.count('load.archive_glyphs', len(entries))
 
+        code_point_to_glyph_info = {}
+        path_to_glyph_file = {}
+        with profiling.stage('load.register'):
+            for relative_path, code_point, dir_flavor, name_flavors, glyph_bitmap, stat_key in entries:
+                if root_dir is None:
+                    glyph_file = GlyphFile(os.path.join(*relative_path.split('/')), code_point, dir_flavor, name_flavors, lazy=True)
+                    glyph_file.glyph_bitmap = glyph_bitmap
+                else:
+                    # The bitmaps stand for the files as they were when archived, so polling and standardizing can tell once a file was edited since.
+                    file_stat = None if stat_key is None else _create_file_stat(stat_key)
+                    glyph_file = GlyphFile(os.path.join(root_dir, *relative_path.split('/')), code_point, dir_flavor, name_flavors, lazy=True, file_stat=file_stat)
+                    glyph_file.restore_glyph_bitmap(glyph_bitmap)
+                _register_glyph_file(code_point_to_glyph_info, path_to_glyph_file, glyph_file)
+
+        # The archive stores each unique bitmap once, so the bitmaps come out deduplicated already.
         return DesignContext(
             root_dir,
             defined_dir_flavors,
@@ -141,7 +434,7 @@ class DesignContext:
 
     def __init__(
             self,
-            root_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+            root_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes] | None,
             defined_dir_flavors: list[str],
             defined_name_flavors: list[str],
             code_point_to_glyph_info: dict[int, GlyphInfo],
@@ -152,55 +445,262 @@ class DesignContext:
         self.defined_name_flavors = defined_name_flavors
         self.code_point_to_glyph_info = code_point_to_glyph_info
         self.path_to_glyph_file = path_to_glyph_file
+        self._is_default_name_flavor_fallen_back = False
 
-        self._sequence_cacher: dict[str, list[int]] = {}
+        self._resolved_index_cacher: dict[str, tuple[list[int], dict[str, list[GlyphFile | None]]]] = {}
         self._alphabet_cacher: dict[str, list[str]] = {}
         self._character_mapping_cacher: dict[(str, str), dict[int, str]] = {}
         self._glyph_files_cacher: dict[(str, str | None), list[GlyphFile]] = {}
-
-    def standardize_glyph_files(self):
-        for old_file_dir, _, old_file_names in list(os.walk(self.root_dir, topdown=False)):
-            for old_file_name in old_file_names:
-                if not old_file_name.endswith('.png'):
+        self._streamed_glyph_files: OrderedDict[GlyphFile, None] = OrderedDict()
+
+    def _clear_cachers(self):
+        self._resolved_index_cacher.clear()
+        self._alphabet_cacher.clear()
+        self._character_mapping_cacher.clear()
+        self._glyph_files_cacher.clear()
+
+    def deduplicate_glyph_bitmaps(self) -> int:
+        # Identical bitmaps end up sharing one instance, whichever dir flavor or name flavor they come from.
+        unique_glyph_bitmaps = {}
+        duplicate_count = 0
+        for glyph_file in self.path_to_glyph_file.values():
+            if not glyph_file.is_glyph_data_loaded:
+                continue
+            glyph_bitmap = glyph_file.glyph_bitmap
+            unique_glyph_bitmap = unique_glyph_bitmaps.setdefault(glyph_bitmap, glyph_bitmap)
+            if unique_glyph_bitmap is not glyph_bitmap:
+                # Same pixels, so the unpacked glyph data and whether the bitmap is from the file stay valid.
+                glyph_file._glyph_bitmap = unique_glyph_bitmap
+                duplicate_count += 1
+        profiling.count('deduplicate.glyph_bitmaps', duplicate_count)
+        return duplicate_count
+
+    def get_duplicate_glyph_files(self) -> list[list[GlyphFile]]:
+        glyph_bitmap_to_glyph_files = {}
+        for glyph_file in self.path_to_glyph_file.values():
+            glyph_bitmap_to_glyph_files.setdefault(glyph_file.glyph_bitmap, []).append(glyph_file)
+        return [glyph_files for glyph_files in glyph_bitmap_to_glyph_files.values() if len(glyph_files) > 1]
+
+    def save_archive(self, file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes]):
+        entries = []
+        for glyph_file in self.path_to_glyph_file.values():
+            if self.root_dir is None:
+                relative_path = glyph_file.file_path
+            else:
+                relative_path = os.path.relpath(glyph_file.file_path, self.root_dir)
+            relative_path = relative_path.replace(os.sep, '/')
+            glyph_bitmap = glyph_file.glyph_bitmap
+            stat_key = _get_stat_key(glyph_file.file_stat) if glyph_file.is_glyph_bitmap_from_file and glyph_file.file_stat is not None else None
+            entries.append((relative_path, glyph_file.code_point, glyph_file.dir_flavor, glyph_file.name_flavors, glyph_bitmap, stat_key))
+        with profiling.stage('save.archive'):
+            archive.save_archive(file_path, self.defined_dir_flavors, self.defined_name_flavors, entries)
+
+    def standardize_glyph_files(self, workers: int = None, dry_run: bool = False) -> tuple[list[str], dict[str, str]]:
+        with profiling.stage('standardize.fix_paths'):
+            fixed_file_paths = self.fix_glyph_file_paths(dry_run)
+        profiling.count('standardize.files_renamed', len(fixed_file_paths))
+        with profiling.stage('standardize.rewrite'):
+            rewritten_file_paths = self.rewrite_glyph_files(workers, dry_run)
+        profiling.count('standardize.files_rewritten', len(rewritten_file_paths))
+        if dry_run:
+            rewritten_file_paths = [fixed_file_paths.get(file_path, file_path) for file_path in rewritten_file_paths]
+        return rewritten_file_paths, fixed_file_paths
+
+    def rewrite_glyph_files(self, workers: int = None, dry_run: bool = False) -> list[str]:
+        # The files are the source of truth, so a bitmap read before a file was edited must never be written over it.
+        for file_path, glyph_file in self.path_to_glyph_file.items():
+            assert not glyph_file.is_glyph_bitmap_outdated, f"Glyph file changed since it was read: '{file_path}'"
+        file_paths = list(self.path_to_glyph_file)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda glyph_file: glyph_file.save(force=False, dry_run=dry_run), self.path_to_glyph_file.values()))
+        rewritten_file_paths = []
+        for file_path, is_rewritten in zip(file_paths, results):
+            if is_rewritten:
+                rewritten_file_paths.append(file_path)
+                logger.debug("Rewrite glyph file: '%s'", file_path)
+        return rewritten_file_paths
+
+    def _get_standard_file_path(self, glyph_file: GlyphFile) -> str:
+        code_point = glyph_file.code_point
+        hex_name = glyph_util.code_point_to_hex_name(code_point)
+        name_flavors = glyph_file.name_flavors
+        file_name = f'{hex_name}{"" if len(name_flavors) == 0 else " "}{",".join(name_flavors)}.png'
+        file_dir = os.path.join(self.root_dir, glyph_file.dir_flavor)
+        if code_point != -1:
+            block = _get_block_by_code_point(code_point)
+            assert block is not None, f"Glyph file code point not in any block: '{glyph_file.file_path}'"
+            block_dir_name = f'{block.code_start:04X}-{block.code_end:04X} {block.name}'
+            if block.code_start == 0x4E00:  # CJK Unified Ideographs
+                block_dir_name = os.path.join(block_dir_name, f'{hex_name[0:-2]}-')
+            file_dir = os.path.join(file_dir, block_dir_name)
+        return os.path.join(file_dir, file_name)
+
+    def _plan_glyph_file_paths(self) -> tuple[list[tuple[str, list[str], list[os.DirEntry]]], dict[str, str]]:
+        scanned_dirs = fs_util.scan_dir(self.root_dir)
+        existing_file_paths = {file_entry.path for _, _, file_entries in scanned_dirs for file_entry in file_entries}
+        planned_file_paths = set()
+        fixed_file_paths = {}
+        for _, _, old_file_entries in reversed(scanned_dirs):
+            for old_file_entry in old_file_entries:
+                if not old_file_entry.name.endswith('.png'):
                     continue
-                old_file_path = os.path.join(old_file_dir, old_file_name)
+                old_file_path = old_file_entry.path
                 assert old_file_path in self.path_to_glyph_file, f"Unmatched glyph file: '{old_file_path}'"
-                glyph_file = self.path_to_glyph_file[old_file_path]
-                glyph_file.save()
-
-                code_point = glyph_file.code_point
-                hex_name = glyph_util.code_point_to_hex_name(glyph_file.code_point)
-                name_flavors = glyph_file.name_flavors
-                file_name = f'{hex_name}{"" if len(name_flavors) == 0 else " "}{",".join(name_flavors)}.png'
-                file_dir = os.path.join(self.root_dir, glyph_file.dir_flavor)
-                if code_point != -1:
-                    block = unidata_blocks.get_block_by_code_point(code_point)
-                    block_dir_name = f'{block.code_start:04X}-{block.code_end:04X} {block.name}'
-                    if block.code_start == 0x4E00:  # CJK Unified Ideographs
-                        block_dir_name = os.path.join(block_dir_name, f'{hex_name[0:-2]}-')
-                    file_dir = os.path.join(file_dir, block_dir_name)
-                file_path = os.path.join(file_dir, file_name)
-
+                file_path = self._get_standard_file_path(self.path_to_glyph_file[old_file_path])
                 if file_path != old_file_path:
-                    assert not os.path.exists(file_path), f"Glyph file duplicate:\n'{file_path}'\n'{old_file_path}'"
-                    fs_util.make_dirs(file_dir)
-                    os.rename(old_file_path, file_path)
-                    glyph_file.file_path = file_path
-                    self.path_to_glyph_file.pop(old_file_path)
-                    self.path_to_glyph_file[file_path] = glyph_file
-                    logger.debug("Fix glyph file path:\nfrom '%s'\nto   '%s'", old_file_path, file_path)
-
-            other_file_names = os.listdir(old_file_dir)
-            if '.DS_Store' in other_file_names:
+                    assert file_path not in existing_file_paths and file_path not in planned_file_paths, f"Glyph file duplicate:\n'{file_path}'\n'{old_file_path}'"
+                    planned_file_paths.add(file_path)
+                    fixed_file_paths[old_file_path] = file_path
+        return scanned_dirs, fixed_file_paths
+
+    def fix_glyph_file_paths(self, dry_run: bool = False) -> dict[str, str]:
+        # Every target path is planned and checked for collisions before anything on disk is touched.
+        scanned_dirs, fixed_file_paths = self._plan_glyph_file_paths()
+        if dry_run:
+            return fixed_file_paths
+        self._clear_cachers()
+
+        root_dir = scanned_dirs[0][0]
+        dir_to_item_count = {dir_path: len(dir_names) + len(file_entries) for dir_path, dir_names, file_entries in scanned_dirs}
+        for file_dir in sorted({os.path.dirname(file_path) for file_path in fixed_file_paths.values()}):
+            if file_dir in dir_to_item_count:
+                continue
+            fs_util.make_dirs(file_dir)
+            # Every newly created parent holds exactly the one new dir below it, up to the first dir that already existed.
+            dir_to_item_count[file_dir] = 0
+            parent_dir = os.path.dirname(file_dir)
+            while parent_dir not in dir_to_item_count:
+                dir_to_item_count[parent_dir] = 1
+                parent_dir = os.path.dirname(parent_dir)
+            dir_to_item_count[parent_dir] += 1
+
+        for old_file_path, file_path in fixed_file_paths.items():
+            os.rename(old_file_path, file_path)
+            dir_to_item_count[os.path.dirname(old_file_path)] -= 1
+            dir_to_item_count[os.path.dirname(file_path)] += 1
+            glyph_file = self.path_to_glyph_file.pop(old_file_path)
+            glyph_file.file_path = file_path
+            self.path_to_glyph_file[file_path] = glyph_file
+            logger.debug("Fix glyph file path:\nfrom '%s'\nto   '%s'", old_file_path, file_path)
+
+        for old_file_dir, _, old_file_entries in reversed(scanned_dirs):
+            if any(file_entry.name == '.DS_Store' for file_entry in old_file_entries):
                 os.remove(os.path.join(old_file_dir, '.DS_Store'))
-                other_file_names.remove('.DS_Store')
-            if len(other_file_names) == 0:
+                dir_to_item_count[old_file_dir] -= 1
+            if dir_to_item_count[old_file_dir] == 0:
                 os.rmdir(old_file_dir)
+                if old_file_dir != root_dir:
+                    dir_to_item_count[os.path.dirname(old_file_dir)] -= 1
+        return fixed_file_paths
 
     def fallback_default_name_flavor(self):
+        self._clear_cachers()
+        self._is_default_name_flavor_fallen_back = True
         for glyph_info in self.code_point_to_glyph_info.values():
             glyph_info.fallback_default_name_flavor(self.defined_name_flavors)
 
+    def poll_glyph_file_changes(self) -> set[tuple[str, str]]:
+        with profiling.stage('poll.scan'):
+            path_to_file_stat = {file_path: file_stat for file_path, _, file_stat in _scan_glyph_files(self.root_dir, self.defined_dir_flavors)}
+        return self._apply_glyph_file_changes(path_to_file_stat)
+
+    def _apply_glyph_file_changes(self, path_to_file_stat: dict[str, os.stat_result]) -> set[tuple[str, str]]:
+        removed_file_paths = [file_path for file_path in self.path_to_glyph_file if file_path not in path_to_file_stat]
+        added_file_paths = []
+        for file_path, file_stat in path_to_file_stat.items():
+            glyph_file = self.path_to_glyph_file.get(file_path, None)
+            if glyph_file is None:
+                added_file_paths.append(file_path)
+            elif glyph_file.file_stat is None or _get_stat_key(glyph_file.file_stat) != _get_stat_key(file_stat):
+                added_file_paths.append(file_path)
+                removed_file_paths.append(file_path)
+        if len(removed_file_paths) == 0 and len(added_file_paths) == 0:
+            return set()
+
+        # Everything that can fail is done before the context is changed, so a bad file leaves it as it was and the next poll sees the same changes.
+        added_glyph_files = []
+        for file_path in added_file_paths:
+            dir_flavor = os.path.relpath(file_path, self.root_dir).split(os.sep, 1)[0]
+            added_glyph_files.append(GlyphFile.load(file_path, dir_flavor, self.defined_name_flavors, lazy=True, file_stat=path_to_file_stat[file_path]))
+        removed_glyph_files = {self.path_to_glyph_file[file_path] for file_path in removed_file_paths}
+        affected_code_points = {glyph_file.code_point for glyph_file in [*removed_glyph_files, *added_glyph_files]}
+        code_point_to_staged_glyph_files = {}
+        for code_point in affected_code_points:
+            old_glyph_info = self.code_point_to_glyph_info.get(code_point, None)
+            glyph_files = [] if old_glyph_info is None else [glyph_file for glyph_file in old_glyph_info.get_glyph_files() if glyph_file not in removed_glyph_files]
+            glyph_files.extend(glyph_file for glyph_file in added_glyph_files if glyph_file.code_point == code_point)
+            staged_glyph_files = [(glyph_file, GlyphFile.parse_file_name(glyph_file.file_path, self.defined_name_flavors)[1]) for glyph_file in glyph_files]
+            check_glyph_info = GlyphInfo(code_point)
+            for glyph_file, name_flavors in staged_glyph_files:
+                check_glyph_info.add_glyph_file(GlyphFile(glyph_file.file_path, code_point, glyph_file.dir_flavor, name_flavors, lazy=True))
+            code_point_to_staged_glyph_files[code_point] = staged_glyph_files
+
+        for file_path in removed_file_paths:
+            self.path_to_glyph_file.pop(file_path)
+        for glyph_file in added_glyph_files:
+            self.path_to_glyph_file[glyph_file.file_path] = glyph_file
+
+        dir_flavors = ['common', *self.defined_dir_flavors]
+        name_flavors = ['', *self.defined_name_flavors]
+        dirty_flavors = set()
+        for code_point, staged_glyph_files in code_point_to_staged_glyph_files.items():
+            old_glyph_info = self.code_point_to_glyph_info.pop(code_point, None)
+            # Restaging can change the name flavors, and so the glyph name, of a file that is still resolved, so names are compared too.
+            old_resolved_glyph_files = {}
+            if old_glyph_info is not None:
+                for dir_flavor in dir_flavors:
+                    for name_flavor in name_flavors:
+                        old_glyph_file = old_glyph_info.resolve(dir_flavor, name_flavor)
+                        old_resolved_glyph_files[dir_flavor, name_flavor] = old_glyph_file, None if old_glyph_file is None else old_glyph_file.glyph_name
+            glyph_info = None
+            if len(staged_glyph_files) > 0:
+                glyph_info = GlyphInfo(code_point)
+                for glyph_file, glyph_file_name_flavors in staged_glyph_files:
+                    glyph_file.name_flavors = glyph_file_name_flavors
+                    glyph_info.add_glyph_file(glyph_file)
+                if self._is_default_name_flavor_fallen_back:
+                    glyph_info.fallback_default_name_flavor(self.defined_name_flavors)
+                self.code_point_to_glyph_info[code_point] = glyph_info
+
+            for dir_flavor in dir_flavors:
+                for name_flavor in name_flavors:
+                    old_glyph_file, old_glyph_name = old_resolved_glyph_files.get((dir_flavor, name_flavor), (None, None))
+                    glyph_file = None if glyph_info is None else glyph_info.resolve(dir_flavor, name_flavor)
+                    if glyph_file is not old_glyph_file or (glyph_file is not None and glyph_file.glyph_name != old_glyph_name):
+                        dirty_flavors.add((dir_flavor, name_flavor))
+
+        dirty_dir_flavors = {dir_flavor for dir_flavor, _ in dirty_flavors}
+        for dir_flavor in dirty_dir_flavors:
+            self._resolved_index_cacher.pop(dir_flavor, None)
+            self._alphabet_cacher.pop(dir_flavor, None)
+        for cache_name in list(self._character_mapping_cacher):
+            if cache_name in dirty_flavors:
+                self._character_mapping_cacher.pop(cache_name)
+        for cache_name in list(self._glyph_files_cacher):
+            dir_flavor, joined_name_flavors = cache_name
+            if any((dir_flavor, name_flavor) in dirty_flavors for name_flavor in joined_name_flavors.split(',')):
+                self._glyph_files_cacher.pop(cache_name)
+        return dirty_flavors
+
+    def watch_glyph_files(
+            self,
+            callback: Callable[[set[tuple[str, str]]], None],
+            interval: float = 1.0,
+            stop_event: threading.Event = None,
+    ):
+        if stop_event is None:
+            stop_event = threading.Event()
+        while not stop_event.is_set():
+            try:
+                dirty_flavors = self.poll_glyph_file_changes()
+            except (AssertionError, ValueError, OSError) as e:
+                # A failed poll leaves the context as it was, so the same changes are picked up again once the files are fixed.
+                logger.error("Glyph file changes not applied: %s", e)
+                dirty_flavors = set()
+            if len(dirty_flavors) > 0:
+                callback(dirty_flavors)
+            stop_event.wait(interval)
+
     def _check_dir_flavor_validity(self, dir_flavor: str):
         if dir_flavor != 'common':
             assert dir_flavor in self.defined_dir_flavors, f"Undefined dir flavor: '{dir_flavor}'"
@@ -209,24 +709,45 @@ class DesignContext:
         if name_flavor != '':
             assert name_flavor in self.defined_name_flavors, f"Undefined name flavor: '{name_flavor}'"
 
+    def _get_resolved_index(self, dir_flavor: str) -> tuple[list[int], dict[str, list[GlyphFile | None]]]:
+        # Sorted code points with one parallel list of resolved glyph files per name flavor, None where a default is missing.
+        if dir_flavor in self._resolved_index_cacher:
+            profiling.count('query.resolved_index_cacher.hit')
+            return self._resolved_index_cacher[dir_flavor]
+        profiling.count('query.resolved_index_cacher.miss')
+        code_points = []
+        name_flavor_to_glyph_files = {name_flavor: [] for name_flavor in ['', *self.defined_name_flavors]}
+        for code_point in sorted(self.code_point_to_glyph_info):
+            name_flavor_registry = self.code_point_to_glyph_info[code_point].query_by_dir_flavor(dir_flavor)
+            if name_flavor_registry is None:
+                continue
+            code_points.append(code_point)
+            default_glyph_file = name_flavor_registry.get('', None)
+            for name_flavor, glyph_files in name_flavor_to_glyph_files.items():
+                glyph_files.append(name_flavor_registry.get(name_flavor, default_glyph_file))
+        resolved_index = code_points, name_flavor_to_glyph_files
+        self._resolved_index_cacher[dir_flavor] = resolved_index
+        return resolved_index
+
+    def get_resolved_index_footprint(self) -> int:
+        footprint = 0
+        for code_points, name_flavor_to_glyph_files in self._resolved_index_cacher.values():
+            footprint += sys.getsizeof(code_points) + sum(sys.getsizeof(code_point) for code_point in code_points)
+            footprint += sys.getsizeof(name_flavor_to_glyph_files) + sum(sys.getsizeof(glyph_files) for glyph_files in name_flavor_to_glyph_files.values())
+        return footprint
+
     def get_sequence(self, dir_flavor: str = 'common') -> list[int]:
         self._check_dir_flavor_validity(dir_flavor)
-        if dir_flavor in self._sequence_cacher:
-            sequence = self._sequence_cacher[dir_flavor]
-        else:
-            sequence = []
-            for glyph_info in self.code_point_to_glyph_info.values():
-                if glyph_info.query_by_dir_flavor(dir_flavor) is not None:
-                    sequence.append(glyph_info.code_point)
-            sequence.sort()
-            self._sequence_cacher[dir_flavor] = sequence
-        return sequence
+        code_points, _ = self._get_resolved_index(dir_flavor)
+        return code_points
 
     def get_alphabet(self, dir_flavor: str = 'common') -> list[str]:
         self._check_dir_flavor_validity(dir_flavor)
         if dir_flavor in self._alphabet_cacher:
+            profiling.count('query.alphabet_cacher.hit')
             alphabet = self._alphabet_cacher[dir_flavor]
         else:
+            profiling.count('query.alphabet_cacher.miss')
             alphabet = [chr(code_point) for code_point in self.get_sequence(dir_flavor) if code_point != -1]
             self._alphabet_cacher[dir_flavor] = alphabet
         return alphabet
@@ -240,17 +761,17 @@ class DesignContext:
         self._check_name_flavor_validity(name_flavor)
         cache_name = dir_flavor, name_flavor
         if cache_name in self._character_mapping_cacher:
+            profiling.count('query.character_mapping_cacher.hit')
             character_mapping = self._character_mapping_cacher[cache_name]
         else:
+            profiling.count('query.character_mapping_cacher.miss')
             character_mapping = {}
-            for code_point, glyph_info in self.code_point_to_glyph_info.items():
+            code_points, name_flavor_to_glyph_files = self._get_resolved_index(dir_flavor)
+            for code_point, glyph_file in zip(code_points, name_flavor_to_glyph_files[name_flavor]):
                 if code_point == -1:
                     continue
-                name_flavor_registry = glyph_info.query_by_dir_flavor(dir_flavor)
-                if name_flavor_registry is not None:
-                    glyph_file = name_flavor_registry.get(name_flavor, name_flavor_registry.get('', None))
-                    assert glyph_file is not None, f"No default name flavor: '{dir_flavor} {code_point:04X}'"
-                    character_mapping[code_point] = glyph_file.glyph_name
+                assert glyph_file is not None, f"No default name flavor: '{dir_flavor} {code_point:04X}'"
+                character_mapping[code_point] = glyph_file.glyph_name
             self._character_mapping_cacher[cache_name] = character_mapping
         return character_mapping
 
@@ -266,19 +787,40 @@ class DesignContext:
             for name_flavor in name_flavors:
                 self._check_name_flavor_validity(name_flavor)
         cache_name = dir_flavor, ','.join(name_flavors)
-        if cache_name is self._glyph_files_cacher:
+        if cache_name in self._glyph_files_cacher:
+            profiling.count('query.glyph_files_cacher.hit')
             glyph_files = self._glyph_files_cacher[cache_name]
         else:
+            profiling.count('query.glyph_files_cacher.miss')
             glyph_files = []
-            sequence = self.get_sequence(dir_flavor)
+            added_glyph_files = set()
+            code_points, name_flavor_to_glyph_files = self._get_resolved_index(dir_flavor)
             for name_flavor in name_flavors:
-                for code_point in sequence:
-                    glyph_info = self.code_point_to_glyph_info[code_point]
-                    name_flavor_registry = glyph_info.query_by_dir_flavor(dir_flavor)
-                    assert name_flavor_registry is not None
-                    glyph_file = name_flavor_registry.get(name_flavor, name_flavor_registry.get('', None))
+                for code_point, glyph_file in zip(code_points, name_flavor_to_glyph_files[name_flavor]):
                     assert glyph_file is not None, f"No default name flavor: '{dir_flavor} {code_point:04X}'"
-                    if glyph_file not in glyph_files:
+                    if glyph_file not in added_glyph_files:
+                        added_glyph_files.add(glyph_file)
                         glyph_files.append(glyph_file)
             self._glyph_files_cacher[cache_name] = glyph_files
         return glyph_files
+
+    def iter_glyph_files(
+            self,
+            dir_flavor: str = 'common',
+            name_flavors: list[str] = None,
+            cache_size: int = 1024,
+    ) -> Iterator[GlyphFile]:
+        assert cache_size > 0, f"Illegal cache size: {cache_size}"
+        # Bitmaps decoded here are kept in a LRU shared by every stream, so glyphs reused across targets are decoded once.
+        for glyph_file in self.get_glyph_files(dir_flavor, name_flavors):
+            if glyph_file in self._streamed_glyph_files:
+                profiling.count('stream.glyph_lru.hit')
+                self._streamed_glyph_files.move_to_end(glyph_file)
+            elif not glyph_file.is_glyph_data_loaded:
+                profiling.count('stream.glyph_lru.miss')
+                glyph_file.load_glyph_data()
+                self._streamed_glyph_files[glyph_file] = None
+                while len(self._streamed_glyph_files) > cache_size:
+                    released_glyph_file, _ = self._streamed_glyph_files.popitem(last=False)
+                    released_glyph_file.release_glyph_data()
+            yield glyph_file
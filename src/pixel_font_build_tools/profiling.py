@@ -0,0 +1,103 @@
+import contextlib
+import heapq
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+
+_active_profiler: 'Profiler | None' = None
+
+
+class Profiler:
+    def __init__(self, slowest_glyphs_count: int = 10):
+        self.slowest_glyphs_count = slowest_glyphs_count
+        self.stage_times: dict[str, float] = {}
+        self.stage_calls: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+        self.glyph_decode_count = 0
+        self.glyph_decode_time = 0.0
+        self._slowest_glyph_decodes: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._previous_profiler: Profiler | None = None
+
+    def __enter__(self) -> 'Profiler':
+        global _active_profiler
+        self._previous_profiler = _active_profiler
+        _active_profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _active_profiler
+        _active_profiler = self._previous_profiler
+        self._previous_profiler = None
+
+    def record_stage(self, name: str, duration: float):
+        with self._lock:
+            self.stage_times[name] = self.stage_times.get(name, 0.0) + duration
+            self.stage_calls[name] = self.stage_calls.get(name, 0) + 1
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_glyph_decode(self, file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes], duration: float):
+        with self._lock:
+            self.glyph_decode_count += 1
+            self.glyph_decode_time += duration
+            item = duration, str(file_path)
+            if len(self._slowest_glyph_decodes) < self.slowest_glyphs_count:
+                heapq.heappush(self._slowest_glyph_decodes, item)
+            elif self.slowest_glyphs_count > 0:
+                heapq.heappushpop(self._slowest_glyph_decodes, item)
+
+    @property
+    def slowest_glyph_decodes(self) -> list[tuple[str, float]]:
+        return [(file_path, duration) for duration, file_path in sorted(self._slowest_glyph_decodes, reverse=True)]
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            'stages': {name: {'calls': self.stage_calls[name], 'time': stage_time} for name, stage_time in self.stage_times.items()},
+            'counters': dict(self.counters),
+            'glyph_decode': {
+                'count': self.glyph_decode_count,
+                'time': self.glyph_decode_time,
+                'slowest': [{'file_path': file_path, 'time': duration} for file_path, duration in self.slowest_glyph_decodes],
+            },
+        }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def save_json(self, file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes]):
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write(self.to_json())
+
+
+def is_active() -> bool:
+    return _active_profiler is not None
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record_stage(name, time.perf_counter() - start_time)
+
+
+def count(name: str, value: int = 1):
+    profiler = _active_profiler
+    if profiler is not None:
+        profiler.count(name, value)
+
+
+def record_glyph_decode(file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes], duration: float):
+    profiler = _active_profiler
+    if profiler is not None:
+        profiler.record_glyph_decode(file_path, duration)
@@ -15,3 +15,21 @@ def make_dirs(path: str | bytes | os.PathLike[str] | os.PathLike[bytes]):
             raise Exception(f"Path exists but not a directory: '{path}'")
     else:
         os.makedirs(path)
+
+
+def scan_dir(path: str | bytes | os.PathLike[str] | os.PathLike[bytes]) -> list[tuple[str, list[str], list[os.DirEntry]]]:
+    results = []
+    pending_dir_paths = [os.fspath(path)]
+    while len(pending_dir_paths) > 0:
+        dir_path = pending_dir_paths.pop()
+        dir_names = []
+        file_entries = []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    dir_names.append(entry.name)
+                else:
+                    file_entries.append(entry)
+        results.append((dir_path, dir_names, file_entries))
+        pending_dir_paths.extend(os.path.join(dir_path, dir_name) for dir_name in reversed(dir_names))
+    return results
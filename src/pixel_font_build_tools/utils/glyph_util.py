@@ -1,42 +1,163 @@
+import io
 import os
+import struct
+import zlib
 
 import png
 
+_ALPHA_TO_BIT = bytes(1 if alpha > 127 else 0 for alpha in range(256))
+_ALPHA_TO_BIT_CHAR = bytes(ord('1') if alpha > 127 else ord('0') for alpha in range(256))
+_BIT_TO_BIT_CHAR = bytes.maketrans(b'\x00\x01', b'01')
+_BIT_CHAR_TO_BIT = bytes.maketrans(b'01', b'\x00\x01')
+_BIT_TO_ALPHA = bytes.maketrans(b'\x00\x01', b'\x00\xff')
+_BIT_CHAR_TO_ALPHA = bytes.maketrans(b'01', b'\x00\xff')
+
+
+_CHUNK_HEADER_FORMAT = struct.Struct('>I4s')
+_IHDR_FORMAT = struct.Struct('>IIBBBBB')
+
+
+def _slice_png_alpha_rows(png_bytes: bytes) -> tuple[list[bytes], int, int] | None:
+    # Glyph files written here are 8 bit RGBA, not interlaced, and every row uses filter type 0,
+    # so the alpha channel can be sliced straight out of the inflated data. None for any other layout.
+    if png_bytes[:8] != png.signature:
+        return None
+    header = None
+    idat_chunks = []
+    offset = 8
+    while offset + _CHUNK_HEADER_FORMAT.size <= len(png_bytes):
+        length, chunk_type = _CHUNK_HEADER_FORMAT.unpack_from(png_bytes, offset)
+        chunk_data = png_bytes[offset + _CHUNK_HEADER_FORMAT.size:offset + _CHUNK_HEADER_FORMAT.size + length]
+        offset += _CHUNK_HEADER_FORMAT.size + length + 4
+        if chunk_type == b'IHDR':
+            if len(chunk_data) != _IHDR_FORMAT.size:
+                return None
+            header = _IHDR_FORMAT.unpack(chunk_data)
+        elif chunk_type == b'IDAT':
+            idat_chunks.append(chunk_data)
+        elif chunk_type == b'IEND':
+            break
+    if header is None:
+        return None
+    width, height, bit_depth, color_type, compression_method, filter_method, interlace_method = header
+    if (bit_depth, color_type, compression_method, filter_method, interlace_method) != (8, 6, 0, 0, 0):
+        return None
+    try:
+        raw = zlib.decompress(b''.join(idat_chunks))
+    except zlib.error:
+        return None
+    stride = width * 4 + 1
+    if len(raw) != stride * height or raw[::stride] != bytes(height):
+        return None
+    alpha_rows = [raw[y * stride + 4:(y + 1) * stride:4] for y in range(height)]
+    return alpha_rows, width, height
+
+
+def _read_png_alpha_rows(file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes]) -> tuple[list[bytes], int, int]:
+    with open(file_path, 'rb') as file:
+        png_bytes = file.read()
+    result = _slice_png_alpha_rows(png_bytes)
+    if result is not None:
+        return result
+    width, height, bitmap, _ = png.Reader(bytes=png_bytes).asRGBA8()
+    alpha_rows = [bytes(bitmap_row[3::4]) for bitmap_row in bitmap]
+    return alpha_rows, width, height
+
+
+def _encode_png_alpha_rows(alpha_rows: list[bytes], width: int) -> bytes:
+    bitmap = []
+    for alpha_row in alpha_rows:
+        bitmap_row = bytearray(width * 4)
+        bitmap_row[3::4] = alpha_row
+        bitmap.append(bitmap_row)
+    buffer = io.BytesIO()
+    png.from_array(bitmap, 'RGBA').write(buffer)
+    return buffer.getvalue()
+
 
 def load_glyph_data_from_png(
         file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
 ) -> tuple[list[list[int]], int, int]:
-    width, height, bitmap, _ = png.Reader(filename=file_path).read()
-    data = []
-    for bitmap_row in bitmap:
-        data_row = []
-        for x in range(0, width * 4, 4):
-            alpha = bitmap_row[x + 3]
-            if alpha > 127:
-                data_row.append(1)
-            else:
-                data_row.append(0)
-        data.append(data_row)
+    alpha_rows, width, height = _read_png_alpha_rows(file_path)
+    data = [list(alpha_row.translate(_ALPHA_TO_BIT)) for alpha_row in alpha_rows]
     return data, width, height
 
 
+def load_glyph_size_from_png(
+        file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+) -> tuple[int, int]:
+    with open(file_path, 'rb') as file:
+        header = file.read(24)
+    if len(header) != 24 or header[:8] != png.signature or header[12:16] != b'IHDR':
+        raise png.FormatError(f"Not a PNG file or missing IHDR chunk: '{file_path}'")
+    width, height = struct.unpack('>II', header[16:24])
+    return width, height
+
+
 def save_glyph_data_to_png(
         data: list[list[int]],
         file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
 ):
-    bitmap = []
-    for data_row in data:
-        bitmap_row = []
-        for x in data_row:
-            bitmap_row.append(0)
-            bitmap_row.append(0)
-            bitmap_row.append(0)
-            if x == 0:
-                bitmap_row.append(0)
-            else:
-                bitmap_row.append(255)
-        bitmap.append(bitmap_row)
-    png.from_array(bitmap, 'RGBA').save(file_path)
+    alpha_rows = [bytes(map(bool, data_row)).translate(_BIT_TO_ALPHA) for data_row in data]
+    width = len(data[0]) if len(data) > 0 else 0
+    with open(file_path, 'wb') as file:
+        file.write(_encode_png_alpha_rows(alpha_rows, width))
+
+
+def _pack_bit_char_rows(bit_char_rows: list[bytes], width: int) -> bytes:
+    row_bytes_length = (width + 7) // 8
+    padding = row_bytes_length * 8 - width
+    packed = bytearray()
+    if width > 0:
+        for bit_char_row in bit_char_rows:
+            value = int(bit_char_row, 2) << padding
+            packed += value.to_bytes(row_bytes_length, 'big')
+    return bytes(packed)
+
+
+def _unpack_bit_char_rows(packed: bytes, width: int, height: int) -> list[bytes]:
+    row_bytes_length = (width + 7) // 8
+    padding = row_bytes_length * 8 - width
+    bit_char_rows = []
+    for y in range(height):
+        if width > 0:
+            value = int.from_bytes(packed[y * row_bytes_length:(y + 1) * row_bytes_length], 'big') >> padding
+            bit_char_rows.append(format(value, f'0{width}b').encode())
+        else:
+            bit_char_rows.append(b'')
+    return bit_char_rows
+
+
+def pack_glyph_data(data: list[list[int]]) -> bytes:
+    width = len(data[0]) if len(data) > 0 else 0
+    return _pack_bit_char_rows([bytes(map(bool, data_row)).translate(_BIT_TO_BIT_CHAR) for data_row in data], width)
+
+
+def unpack_glyph_data(packed: bytes, width: int, height: int) -> list[list[int]]:
+    return [list(bit_char_row.translate(_BIT_CHAR_TO_BIT)) for bit_char_row in _unpack_bit_char_rows(packed, width, height)]
+
+
+def load_packed_glyph_data_from_png(
+        file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+) -> tuple[bytes, int, int]:
+    alpha_rows, width, height = _read_png_alpha_rows(file_path)
+    packed = _pack_bit_char_rows([alpha_row.translate(_ALPHA_TO_BIT_CHAR) for alpha_row in alpha_rows], width)
+    return packed, width, height
+
+
+def encode_packed_glyph_data_to_png(packed: bytes, width: int, height: int) -> bytes:
+    alpha_rows = [bit_char_row.translate(_BIT_CHAR_TO_ALPHA) for bit_char_row in _unpack_bit_char_rows(packed, width, height)]
+    return _encode_png_alpha_rows(alpha_rows, width)
+
+
+def save_packed_glyph_data_to_png(
+        packed: bytes,
+        width: int,
+        height: int,
+        file_path: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+):
+    with open(file_path, 'wb') as file:
+        file.write(encode_packed_glyph_data_to_png(packed, width, height))
 
 
 def hex_name_to_code_point(hex_name: str) -> int:
@@ -0,0 +1,74 @@
+import os
+
+import png
+
+from pixel_font_build_tools.context import GlyphFile, GlyphInfo
+from pixel_font_build_tools.utils import fs_util, glyph_util
+
+
+def validate_glyph_files(
+        root_dir: str | bytes | os.PathLike[str] | os.PathLike[bytes],
+        defined_dir_flavors: list[str] = None,
+        defined_name_flavors: list[str] = None,
+        fallback_default_name_flavor: bool = False,
+        check_png_headers: bool = False,
+) -> list[str]:
+    # Runs the same checks as loading and querying a context, but collects every error instead of stopping at the first, and never decodes a bitmap.
+    # The rules are shared with 'GlyphFile' and 'GlyphInfo' through their 'try_' methods, which collect errors instead of asserting, so they still run under 'python -O'.
+    if defined_dir_flavors is None:
+        defined_dir_flavors = []
+    if defined_name_flavors is None:
+        defined_name_flavors = []
+
+    errors = []
+    file_infos = []
+    with os.scandir(root_dir) as entries:
+        entries = sorted(entries, key=lambda entry: entry.name)
+    for entry in entries:
+        if not entry.is_dir():
+            if entry.name.endswith('.png'):
+                errors.append(f"Unmatched glyph file: '{entry.path}'")
+            continue
+        dir_flavor = entry.name
+        if dir_flavor != 'common' and dir_flavor not in defined_dir_flavors:
+            errors.append(f"Undefined dir flavor: '{dir_flavor}'")
+            continue
+        for _, _, file_entries in fs_util.scan_dir(entry.path):
+            for file_entry in file_entries:
+                if file_entry.name.endswith('.png'):
+                    file_infos.append((file_entry.path, dir_flavor))
+    file_infos.sort()
+
+    code_point_to_glyph_info = {}
+    for file_path, dir_flavor in file_infos:
+        code_point, name_flavors, file_name_errors = GlyphFile.try_parse_file_name(file_path, defined_name_flavors)
+        errors.extend(file_name_errors)
+        if len(file_name_errors) > 0:
+            continue
+
+        if check_png_headers:
+            try:
+                glyph_util.load_glyph_size_from_png(file_path)
+            except png.FormatError as e:
+                errors.append(e.args[0])
+                continue
+
+        if code_point not in code_point_to_glyph_info:
+            code_point_to_glyph_info[code_point] = GlyphInfo(code_point)
+        errors.extend(code_point_to_glyph_info[code_point].try_add_glyph_file(GlyphFile(file_path, code_point, dir_flavor, name_flavors, lazy=True)))
+
+    for code_point, glyph_info in sorted(code_point_to_glyph_info.items()):
+        checked_registries = []
+        for dir_flavor in ['common', *defined_dir_flavors]:
+            name_flavor_registry = glyph_info.query_by_dir_flavor(dir_flavor)
+            if name_flavor_registry is None or any(name_flavor_registry is registry for registry in checked_registries):
+                continue
+            checked_registries.append(name_flavor_registry)
+            # With the fallback, the first defined name flavor of the registry becomes its default.
+            if '' in name_flavor_registry or fallback_default_name_flavor:
+                continue
+            missing_name_flavors = [name_flavor for name_flavor in defined_name_flavors if name_flavor not in name_flavor_registry]
+            if len(missing_name_flavors) > 0:
+                registry_dir_flavor = next(iter(name_flavor_registry.values())).dir_flavor
+                errors.append(f"No default name flavor: '{registry_dir_flavor} {code_point:04X}' ({', '.join(missing_name_flavors)})")
+    return errors
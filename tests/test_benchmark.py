@@ -0,0 +1,20 @@
+import json
+import os
+
+from benchmarks import benchmark
+
+
+def test_benchmark(tmp_path):
+    output_file_path = os.path.join(tmp_path, 'results.json')
+    benchmark.main(['--sizes', '200', '--workers', '2', '--work-dir', os.path.join(tmp_path, 'work'), '--output', output_file_path, '--skip-cli-cold-start'])
+    with open(output_file_path, 'r', encoding='utf-8') as file:
+        report = json.load(file)
+    stages = [result['stage'] for result in report['results']]
+    assert 'load' in stages
+    assert 'standardize_glyph_files (cold)' in stages
+    assert 'build_fonts' in stages
+    assert 'build_fonts (workers=2)' in stages
+    assert os.path.isfile(os.path.join(tmp_path, 'work', 'outputs-200', 'monospaced.otc'))
+    assert all(result['glyph_count'] == 200 for result in report['results'])
+    assert report['cli_cold_start'] is None
+    assert os.path.isdir(os.path.join(tmp_path, 'work', 'glyphs-200'))
@@ -0,0 +1,53 @@
+import os
+import shutil
+
+from examples import demo
+from pixel_font_build_tools import DesignContext, build
+from pixel_font_build_tools.build import FontTarget, FontCollectionTarget
+
+
+def _create_targets(outputs_dir: str) -> list[FontTarget | FontCollectionTarget]:
+    targets = []
+    for width_mode in demo.width_modes:
+        for language_flavor in ['latin', 'zh_cn']:
+            for font_format in ['otf', 'bdf']:
+                targets.append(FontTarget(os.path.join(outputs_dir, f'{width_mode}-{language_flavor}.{font_format}'), font_format, width_mode, language_flavor))
+        targets.append(FontCollectionTarget(os.path.join(outputs_dir, f'{width_mode}.otc'), 'otc', width_mode, demo.language_flavors))
+    return targets
+
+
+def test_build_fonts(tmp_path, monkeypatch):
+    context = DesignContext.load(demo.glyphs_dir, defined_dir_flavors=demo.width_modes, defined_name_flavors=demo.language_flavors)
+    outputs_dir = os.path.join(tmp_path, 'outputs')
+    cache_dir = os.path.join(tmp_path, 'cache')
+    os.makedirs(outputs_dir)
+    targets = _create_targets(outputs_dir)
+
+    build.build_fonts(context, targets, demo._create_builder, workers=2, cache_dir=cache_dir)
+    assert sorted(os.listdir(outputs_dir)) == sorted(os.path.basename(target.file_path) for target in targets)
+    assert len(os.listdir(cache_dir)) == len(targets)
+
+    def save(*args):
+        raise AssertionError('Cached target rebuilt')
+
+    monkeypatch.setattr(build, '_save_font', save)
+    monkeypatch.setattr(build, '_save_font_collection', save)
+    for target in targets:
+        os.remove(target.file_path)
+    build.build_fonts(context, targets, demo._create_builder, cache_dir=cache_dir)
+    assert sorted(os.listdir(outputs_dir)) == sorted(os.path.basename(target.file_path) for target in targets)
+    assert len(os.listdir(cache_dir)) == len(targets)
+
+
+def test_build_fonts_without_default_name_flavor(tmp_path):
+    glyphs_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(demo.glyphs_dir, glyphs_dir)
+    cjk_dir = os.path.join(glyphs_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '4E-')
+    os.rename(os.path.join(cjk_dir, '4E2D.png'), os.path.join(cjk_dir, f'4E2D {",".join(demo.language_flavors)}.png'))
+    context = DesignContext.load(glyphs_dir, defined_dir_flavors=demo.width_modes, defined_name_flavors=demo.language_flavors)
+    outputs_dir = os.path.join(tmp_path, 'outputs')
+    os.makedirs(outputs_dir)
+    targets = _create_targets(outputs_dir)
+
+    build.build_fonts(context, targets, demo._create_builder)
+    assert sorted(os.listdir(outputs_dir)) == sorted(os.path.basename(target.file_path) for target in targets)
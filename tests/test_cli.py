@@ -0,0 +1,48 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from pixel_font_build_tools import cli
+
+project_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+glyphs_dir = os.path.join(project_root_dir, 'assets', 'glyphs')
+
+flavor_args = ['--dir-flavors', 'monospaced', 'proportional', '--name-flavors', 'latin', 'zh_cn', 'zh_hk', 'zh_tw', 'zh_tr', 'ja', 'ko']
+
+
+def test_import_cost():
+    code = 'import sys, pixel_font_build_tools, pixel_font_build_tools.cli; print(sorted({"png", "unidata_blocks", "pixel_font_builder", "pixel_font_build_tools.context"} & set(sys.modules)))'
+    env = dict(os.environ, PYTHONPATH=os.path.join(project_root_dir, 'src'))
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '[]'
+
+
+def test_validate(capsys):
+    assert cli.main(['validate', glyphs_dir, *flavor_args, '--check-png-headers']) == 0
+    assert cli.main(['validate', glyphs_dir, '--dir-flavors', 'monospaced', '--name-flavors', *flavor_args[4:]]) == 1
+    assert capsys.readouterr().out == "Undefined dir flavor: 'proportional'\n"
+
+
+def test_standardize(tmp_path, capsys):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    file_path = os.path.join(root_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '4E-', '4E2D.png')
+    os.rename(file_path, os.path.join(root_dir, 'common', '4E2D.png'))
+    assert cli.main(['standardize', root_dir, *flavor_args, '--dry-run']) == 1
+    assert cli.main(['standardize', root_dir, *flavor_args]) == 0
+    assert os.path.exists(file_path)
+    assert cli.main(['standardize', root_dir, *flavor_args, '--dry-run']) == 0
+
+
+def test_stats(capsys):
+    assert cli.main(['stats', glyphs_dir, *flavor_args]) == 0
+    assert capsys.readouterr().out.startswith('glyph files: 267\ncode points: 146\n')
+
+
+def test_build(tmp_path):
+    outputs_dir = os.path.join(tmp_path, 'outputs')
+    assert cli.main(['build', glyphs_dir, outputs_dir, *flavor_args, '--builder', 'examples.demo:_create_builder', '--font-name', 'demo', '--formats', 'bdf', '--collection-formats', 'otc']) == 0
+    assert len(os.listdir(outputs_dir)) == 2 * 7 + 2
+    assert os.path.isfile(os.path.join(outputs_dir, 'demo-monospaced-zh_cn.bdf'))
+    assert os.path.isfile(os.path.join(outputs_dir, 'demo-proportional.otc'))
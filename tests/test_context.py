@@ -0,0 +1,368 @@
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+
+import pytest
+
+from pixel_font_build_tools import DesignContext, GlyphBitmap, profiling
+from pixel_font_build_tools.utils import glyph_util
+
+project_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+glyphs_dir = os.path.join(project_root_dir, 'assets', 'glyphs')
+
+dir_flavors = ['monospaced', 'proportional']
+name_flavors = ['latin', 'zh_cn', 'zh_hk', 'zh_tw', 'zh_tr', 'ja', 'ko']
+
+
+def _load_context(**kwargs) -> DesignContext:
+    return DesignContext.load(glyphs_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors, **kwargs)
+
+
+def test_load_with_workers():
+    serial_context = _load_context()
+    parallel_context = _load_context(workers=2)
+    assert list(parallel_context.path_to_glyph_file) == list(serial_context.path_to_glyph_file)
+    for file_path, glyph_file in serial_context.path_to_glyph_file.items():
+        other_glyph_file = parallel_context.path_to_glyph_file[file_path]
+        assert other_glyph_file.code_point == glyph_file.code_point
+        assert other_glyph_file.name_flavors == glyph_file.name_flavors
+        assert other_glyph_file.glyph_data == glyph_file.glyph_data
+        assert other_glyph_file.glyph_width == glyph_file.glyph_width
+        assert other_glyph_file.glyph_height == glyph_file.glyph_height
+    for dir_flavor in ['common', *dir_flavors]:
+        assert parallel_context.get_sequence(dir_flavor) == serial_context.get_sequence(dir_flavor)
+        for name_flavor in name_flavors:
+            assert parallel_context.get_character_mapping(dir_flavor, name_flavor) == serial_context.get_character_mapping(dir_flavor, name_flavor)
+
+
+def test_load_lazy():
+    context = _load_context()
+    lazy_context = _load_context(lazy=True)
+    assert all(not glyph_file.is_glyph_data_loaded for glyph_file in lazy_context.path_to_glyph_file.values())
+    for dir_flavor in ['common', *dir_flavors]:
+        assert lazy_context.get_alphabet(dir_flavor) == context.get_alphabet(dir_flavor)
+    assert all(not glyph_file.is_glyph_data_loaded for glyph_file in lazy_context.path_to_glyph_file.values())
+
+    for file_path, glyph_file in context.path_to_glyph_file.items():
+        lazy_glyph_file = lazy_context.path_to_glyph_file[file_path]
+        assert lazy_glyph_file.glyph_size == glyph_file.glyph_size
+        assert not lazy_glyph_file.is_glyph_data_loaded
+        assert lazy_glyph_file.glyph_data == glyph_file.glyph_data
+        assert lazy_glyph_file.is_glyph_data_loaded
+
+
+def test_load_with_cache_dir(tmp_path, monkeypatch):
+    context = _load_context()
+    _load_context(cache_dir=tmp_path)
+
+    def load_png(file_path):
+        raise AssertionError(f"Glyph file decoded: '{file_path}'")
+
+    monkeypatch.setattr(GlyphBitmap, 'load_png', staticmethod(load_png))
+    with profiling.Profiler() as profiler:
+        cached_context = _load_context(cache_dir=tmp_path)
+    assert profiler.counters['load.glyph_cache.hit'] == len(context.path_to_glyph_file)
+    assert profiler.counters['load.glyph_cache.miss'] == 0
+    for file_path, glyph_file in context.path_to_glyph_file.items():
+        cached_glyph_file = cached_context.path_to_glyph_file[file_path]
+        assert cached_glyph_file.glyph_size == glyph_file.glyph_size
+        assert cached_glyph_file.glyph_data == glyph_file.glyph_data
+
+
+def test_load_with_cache_dir_prunes_removed_files(tmp_path):
+    root_dir = tmp_path.joinpath('glyphs')
+    cache_dir = tmp_path.joinpath('cache')
+    shutil.copytree(glyphs_dir, root_dir)
+    DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors, cache_dir=cache_dir)
+
+    file_path = next(iter(sorted(root_dir.joinpath('common').rglob('*.png'))))
+    os.remove(file_path)
+    with profiling.Profiler() as profiler:
+        context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors, cache_dir=cache_dir)
+    assert profiler.counters['load.glyph_cache.pruned'] == 1
+    connection = sqlite3.connect(cache_dir.joinpath('glyphs.sqlite3'))
+    file_paths = {row[0] for row in connection.execute('SELECT file_path FROM glyph')}
+    connection.close()
+    assert file_paths == {os.path.abspath(glyph_file.file_path) for glyph_file in context.path_to_glyph_file.values()}
+
+
+def test_glyph_bitmap():
+    context = _load_context()
+    for glyph_file in context.path_to_glyph_file.values():
+        glyph_data, glyph_width, glyph_height = glyph_util.load_glyph_data_from_png(glyph_file.file_path)
+        assert glyph_file.glyph_bitmap.size == (glyph_width, glyph_height)
+        assert glyph_file.glyph_data == glyph_data
+        assert GlyphBitmap.from_glyph_data(glyph_data) == glyph_file.glyph_bitmap
+
+
+def test_get_glyph_files():
+    context = _load_context(lazy=True)
+    glyph_files = context.get_glyph_files('monospaced')
+    assert context.get_glyph_files('monospaced') is glyph_files
+    assert len(set(glyph_files)) == len(glyph_files)
+    assert glyph_files == context.get_glyph_files('monospaced', name_flavors)
+
+    context.fallback_default_name_flavor()
+    assert context.get_glyph_files('monospaced') is not glyph_files
+
+
+def test_resolved_index():
+    context = _load_context(lazy=True)
+    assert context.get_resolved_index_footprint() == 0
+    sequence = context.get_sequence('proportional')
+    assert sequence == sorted(sequence)
+    footprint = context.get_resolved_index_footprint()
+    assert footprint > 0
+    for name_flavor in name_flavors:
+        character_mapping = context.get_character_mapping('proportional', name_flavor)
+        assert list(character_mapping) == [code_point for code_point in sequence if code_point != -1]
+        for code_point, glyph_name in character_mapping.items():
+            assert context.code_point_to_glyph_info[code_point].resolve('proportional', name_flavor).glyph_name == glyph_name
+    assert context.get_resolved_index_footprint() == footprint
+
+    context.fallback_default_name_flavor()
+    assert context.get_resolved_index_footprint() == 0
+
+
+def test_standardize_glyph_files(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    assert context.standardize_glyph_files() == ([], {})
+
+    notdef_file_path = os.path.join(root_dir, 'common', 'notdef.png')
+    file_path = os.path.join(root_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '4E-', '4E2D.png')
+    os.rename(file_path, os.path.join(root_dir, 'common', '4E2D.png'))
+    with open(notdef_file_path, 'rb') as file:
+        png_bytes = file.read()
+    with open(notdef_file_path, 'wb') as file:
+        file.write(png_bytes + b'\0')
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    assert context.standardize_glyph_files(dry_run=True) == ([notdef_file_path], {os.path.join(root_dir, 'common', '4E2D.png'): file_path})
+    assert os.path.exists(os.path.join(root_dir, 'common', '4E2D.png'))
+    assert context.fix_glyph_file_paths() == {os.path.join(root_dir, 'common', '4E2D.png'): file_path}
+    assert context.rewrite_glyph_files() == [notdef_file_path]
+    with open(notdef_file_path, 'rb') as file:
+        assert file.read() == png_bytes
+    assert context.standardize_glyph_files() == ([], {})
+
+    nested_root_dir = os.path.join(tmp_path, 'nested-glyphs')
+    os.makedirs(os.path.join(nested_root_dir, 'common'))
+    shutil.copyfile(file_path, os.path.join(nested_root_dir, 'common', '4E2D.png'))
+    context = DesignContext.load(nested_root_dir)
+    nested_file_path = os.path.join(nested_root_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '4E-', '4E2D.png')
+    assert context.standardize_glyph_files() == ([], {os.path.join(nested_root_dir, 'common', '4E2D.png'): nested_file_path})
+    assert os.path.isfile(nested_file_path)
+
+
+def test_standardize_glyph_files_checked_before_changes(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    cjk_dir = os.path.join(root_dir, 'common', '4E00-9FFF CJK Unified Ideographs')
+    for file_path in [os.path.join(cjk_dir, '4E-', '4E2D.png'), os.path.join(cjk_dir, '90-', '9023.png')]:
+        os.rename(file_path, os.path.join(root_dir, 'common', os.path.basename(file_path)))
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors, lazy=True)
+    shutil.copyfile(os.path.join(root_dir, 'common', '9023.png'), os.path.join(cjk_dir, '90-', '9023.png'))
+    with pytest.raises(AssertionError, match='Unmatched glyph file'):
+        context.standardize_glyph_files()
+    assert os.path.exists(os.path.join(root_dir, 'common', '4E2D.png'))
+    assert os.path.exists(os.path.join(root_dir, 'common', '9023.png'))
+
+
+def test_poll_glyph_file_changes(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    for dir_flavor in ['common', *dir_flavors]:
+        for name_flavor in name_flavors:
+            context.get_character_mapping(dir_flavor, name_flavor)
+    assert context.poll_glyph_file_changes() == set()
+
+    cjk_dir = os.path.join(root_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '90-')
+    os.remove(os.path.join(cjk_dir, '904E zh_cn.png'))
+    shutil.copyfile(os.path.join(cjk_dir, '9023.png'), os.path.join(root_dir, 'monospaced', '9023.png'))
+    dirty_flavors = context.poll_glyph_file_changes()
+    assert dirty_flavors == {('common', 'zh_cn'), ('monospaced', 'zh_cn'), ('proportional', 'zh_cn'), *(('monospaced', name_flavor) for name_flavor in ['', *name_flavors])}
+
+    fresh_context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    for dir_flavor in ['common', *dir_flavors]:
+        assert context.get_sequence(dir_flavor) == fresh_context.get_sequence(dir_flavor)
+        for name_flavor in name_flavors:
+            assert context.get_character_mapping(dir_flavor, name_flavor) == fresh_context.get_character_mapping(dir_flavor, name_flavor)
+            assert [glyph_file.file_path for glyph_file in context.get_glyph_files(dir_flavor, [name_flavor])] == [glyph_file.file_path for glyph_file in fresh_context.get_glyph_files(dir_flavor, [name_flavor])]
+
+
+def test_poll_glyph_file_changes_with_fallback(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    context.fallback_default_name_flavor()
+    for name_flavor in name_flavors:
+        context.get_character_mapping('common', name_flavor)
+
+    # The 'zh_cn' file becomes the default, so it is still resolved for 'zh_cn' but under another glyph name.
+    os.remove(os.path.join(root_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '90-', '904E.png'))
+    assert ('common', 'zh_cn') in context.poll_glyph_file_changes()
+    glyph_name = next(glyph_file.glyph_name for glyph_file in context.get_glyph_files('common', ['zh_cn']) if glyph_file.code_point == 0x904E)
+    assert context.get_character_mapping('common', 'zh_cn')[0x904E] == glyph_name == 'uni904E'
+
+
+def test_archive(tmp_path):
+    context = _load_context()
+    archive_file_path = os.path.join(tmp_path, 'glyphs.pfba')
+    context.save_archive(archive_file_path)
+
+    archive_context = DesignContext.load_archive(archive_file_path, glyphs_dir)
+    assert archive_context.defined_dir_flavors == dir_flavors
+    assert archive_context.defined_name_flavors == name_flavors
+    assert list(archive_context.path_to_glyph_file) == list(context.path_to_glyph_file)
+    for file_path, glyph_file in context.path_to_glyph_file.items():
+        archive_glyph_file = archive_context.path_to_glyph_file[file_path]
+        assert archive_glyph_file.code_point == glyph_file.code_point
+        assert archive_glyph_file.dir_flavor == glyph_file.dir_flavor
+        assert archive_glyph_file.name_flavors == glyph_file.name_flavors
+        assert archive_glyph_file.glyph_bitmap == glyph_file.glyph_bitmap
+        assert pickle.loads(pickle.dumps(archive_glyph_file.glyph_bitmap)) == glyph_file.glyph_bitmap
+    for dir_flavor in ['common', *dir_flavors]:
+        for name_flavor in name_flavors:
+            assert archive_context.get_character_mapping(dir_flavor, name_flavor) == context.get_character_mapping(dir_flavor, name_flavor)
+
+
+def test_archive_with_edited_file(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    archive_file_path = os.path.join(tmp_path, 'glyphs.pfba')
+    context.save_archive(archive_file_path)
+
+    file_path = os.path.join(root_dir, 'common', 'notdef.png')
+    glyph_data = context.path_to_glyph_file[file_path].glyph_data
+    glyph_data = [[1 - x for x in glyph_data_row] for glyph_data_row in glyph_data]
+    glyph_util.save_glyph_data_to_png(glyph_data, file_path)
+    file_stat = os.stat(file_path)
+    os.utime(file_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1_000_000_000))
+
+    # The archived bitmap is older than the file, so it must not be written over it.
+    archive_context = DesignContext.load_archive(archive_file_path, root_dir)
+    with pytest.raises(AssertionError, match='changed since it was read'):
+        archive_context.standardize_glyph_files()
+    assert glyph_util.load_glyph_data_from_png(file_path)[0] == glyph_data
+
+    assert ('common', '') in archive_context.poll_glyph_file_changes()
+    archive_context.standardize_glyph_files()
+    assert archive_context.path_to_glyph_file[file_path].glyph_data == glyph_data
+    assert glyph_util.load_glyph_data_from_png(file_path)[0] == glyph_data
+
+    # Without the stats of the files, every glyph file counts as changed.
+    DesignContext.load_archive(archive_file_path).save_archive(archive_file_path)
+    archive_context = DesignContext.load_archive(archive_file_path, root_dir)
+    with pytest.raises(AssertionError, match='changed since it was read'):
+        archive_context.rewrite_glyph_files()
+    archive_context.poll_glyph_file_changes()
+    assert archive_context.rewrite_glyph_files() == []
+
+
+def test_deduplicate_glyph_bitmaps(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    file_path = os.path.join(root_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '90-', '9023.png')
+    copied_file_path = os.path.join(root_dir, 'monospaced', '9023.png')
+    shutil.copyfile(file_path, copied_file_path)
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    assert context.path_to_glyph_file[copied_file_path].glyph_bitmap is context.path_to_glyph_file[file_path].glyph_bitmap
+    assert [[glyph_file.file_path for glyph_file in glyph_files] for glyph_files in context.get_duplicate_glyph_files()] == [[file_path, copied_file_path]]
+
+    archive_file_path = os.path.join(tmp_path, 'glyphs.pfba')
+    context.save_archive(archive_file_path)
+    archive_context = DesignContext.load_archive(archive_file_path, root_dir)
+    assert archive_context.path_to_glyph_file[copied_file_path].glyph_bitmap is archive_context.path_to_glyph_file[file_path].glyph_bitmap
+
+
+def test_iter_glyph_files():
+    context = _load_context()
+    lazy_context = _load_context(lazy=True)
+    glyph_files = lazy_context.get_glyph_files('proportional')
+    streamed_glyph_files = []
+    for glyph_file in lazy_context.iter_glyph_files('proportional', cache_size=8):
+        assert glyph_file.is_glyph_data_loaded
+        assert glyph_file.glyph_data == context.path_to_glyph_file[glyph_file.file_path].glyph_data
+        streamed_glyph_files.append(glyph_file)
+    assert streamed_glyph_files == glyph_files
+    assert sum(glyph_file.is_glyph_data_loaded for glyph_file in glyph_files) == 8
+    assert all(glyph_file.glyph_size == context.path_to_glyph_file[glyph_file.file_path].glyph_size for glyph_file in glyph_files)
+
+    edited_glyph_file = glyph_files[0]
+    edited_glyph_file.glyph_data = [[1]]
+    assert not edited_glyph_file.release_glyph_data()
+    assert edited_glyph_file.glyph_data == [[1]]
+
+
+def test_poll_glyph_file_changes_with_bad_file(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    sequence = list(context.get_sequence())
+    os.remove(os.path.join(root_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '8F-', '8FDE.png'))
+    bad_file_path = os.path.join(root_dir, 'common', 'Untitled.png')
+    shutil.copyfile(os.path.join(root_dir, 'common', 'notdef.png'), bad_file_path)
+    with pytest.raises(ValueError):
+        context.poll_glyph_file_changes()
+    assert context.get_sequence() == sequence
+
+    os.remove(bad_file_path)
+    assert ('common', '') in context.poll_glyph_file_changes()
+    assert 0x8FDE not in context.get_sequence()
+
+
+def test_watch_glyph_files(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    os.remove(os.path.join(root_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '8F-', '8FDE.png'))
+    bad_file_path = os.path.join(root_dir, 'common', 'Untitled.png')
+    shutil.copyfile(os.path.join(root_dir, 'common', 'notdef.png'), bad_file_path)
+    stop_event = threading.Event()
+    changes = []
+
+    def callback(dirty_flavors):
+        changes.append(dirty_flavors)
+        stop_event.set()
+
+    # The bad file only fails the polls until it is removed, then the change behind it comes through.
+    timer = threading.Timer(0.1, os.remove, [bad_file_path])
+    timer.start()
+    context.watch_glyph_files(callback, interval=0.01, stop_event=stop_event)
+    timer.join()
+    assert len(changes) == 1
+    assert ('common', '') in changes[0]
+
+
+def test_glyph_data_edit_in_place(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    context = DesignContext.load(root_dir, defined_dir_flavors=dir_flavors, defined_name_flavors=name_flavors)
+    glyph_file = context.path_to_glyph_file[os.path.join(root_dir, 'common', 'notdef.png')]
+    glyph_data = glyph_file.glyph_data
+    assert glyph_file.glyph_data is glyph_data
+    glyph_data[0][0] = 1 - glyph_data[0][0]
+    assert not glyph_file.release_glyph_data()
+    assert glyph_file.glyph_bitmap == GlyphBitmap.from_glyph_data(glyph_data)
+    assert glyph_file.save(force=False)
+    assert glyph_util.load_glyph_data_from_png(glyph_file.file_path)[0] == glyph_data
+
+
+def test_glyph_size_with_glyph_data(monkeypatch):
+    context = _load_context()
+    glyph_files = list(context.path_to_glyph_file.values())
+    glyph_sizes = [glyph_file.glyph_size for glyph_file in glyph_files]
+    for glyph_file in glyph_files:
+        assert glyph_file.glyph_data is not None
+
+    def from_glyph_data(data):
+        raise AssertionError('Glyph data repacked')
+
+    monkeypatch.setattr(GlyphBitmap, 'from_glyph_data', staticmethod(from_glyph_data))
+    assert [glyph_file.glyph_size for glyph_file in glyph_files] == glyph_sizes
+    assert [(glyph_file.glyph_width, glyph_file.glyph_height) for glyph_file in glyph_files] == glyph_sizes
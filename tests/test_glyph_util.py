@@ -0,0 +1,74 @@
+import os
+
+import png
+
+from pixel_font_build_tools.utils import glyph_util
+
+project_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+glyphs_dir = os.path.join(project_root_dir, 'assets', 'glyphs')
+
+
+def _iter_png_file_paths():
+    for file_dir, _, file_names in os.walk(glyphs_dir):
+        for file_name in file_names:
+            if file_name.endswith('.png'):
+                yield os.path.join(file_dir, file_name)
+
+
+def _load_reference_glyph_data(file_path: str) -> tuple[list[list[int]], int, int]:
+    width, height, bitmap, _ = png.Reader(filename=file_path).read()
+    data = [[1 if bitmap_row[x + 3] > 127 else 0 for x in range(0, width * 4, 4)] for bitmap_row in bitmap]
+    return data, width, height
+
+
+def _save_reference_glyph_data(data: list[list[int]], file_path: str):
+    bitmap = [[value for x in data_row for value in (0, 0, 0, 0 if x == 0 else 255)] for data_row in data]
+    png.from_array(bitmap, 'RGBA').save(file_path)
+
+
+def test_load_and_save(tmp_path):
+    for file_path in _iter_png_file_paths():
+        data, width, height = _load_reference_glyph_data(file_path)
+        assert glyph_util.load_glyph_data_from_png(file_path) == (data, width, height)
+        assert glyph_util.load_glyph_size_from_png(file_path) == (width, height)
+
+        packed, packed_width, packed_height = glyph_util.load_packed_glyph_data_from_png(file_path)
+        assert (packed_width, packed_height) == (width, height)
+        assert packed == glyph_util.pack_glyph_data(data)
+        assert glyph_util.unpack_glyph_data(packed, width, height) == data
+
+        reference_file_path = os.path.join(tmp_path, 'reference.png')
+        _save_reference_glyph_data(data, reference_file_path)
+        with open(reference_file_path, 'rb') as file:
+            reference_png = file.read()
+
+        saved_file_path = os.path.join(tmp_path, 'saved.png')
+        glyph_util.save_glyph_data_to_png(data, saved_file_path)
+        with open(saved_file_path, 'rb') as file:
+            assert file.read() == reference_png
+
+        glyph_util.save_packed_glyph_data_to_png(packed, width, height, saved_file_path)
+        with open(saved_file_path, 'rb') as file:
+            assert file.read() == reference_png
+
+
+def test_load_other_png_layouts(tmp_path):
+    # Layouts other than plain 8 bit RGBA are not sliced directly but still decoded, through pypng.
+    file_path = os.path.join(glyphs_dir, 'common', 'notdef.png')
+    data, width, height = _load_reference_glyph_data(file_path)
+    alpha_rows = [[0 if x == 0 else 255 for x in data_row] for data_row in data]
+
+    interlaced_file_path = os.path.join(tmp_path, 'interlaced.png')
+    bitmap = [[value for alpha in alpha_row for value in (0, 0, 0, alpha)] for alpha_row in alpha_rows]
+    with open(interlaced_file_path, 'wb') as file:
+        png.Writer(width, height, greyscale=False, alpha=True, interlace=True).write(file, bitmap)
+
+    grey_alpha_file_path = os.path.join(tmp_path, 'grey_alpha.png')
+    bitmap = [[value for alpha in alpha_row for value in (0, alpha)] for alpha_row in alpha_rows]
+    with open(grey_alpha_file_path, 'wb') as file:
+        png.Writer(width, height, greyscale=True, alpha=True).write(file, bitmap)
+
+    for other_file_path in [interlaced_file_path, grey_alpha_file_path]:
+        with open(other_file_path, 'rb') as file:
+            assert glyph_util._slice_png_alpha_rows(file.read()) is None
+        assert glyph_util.load_glyph_data_from_png(other_file_path) == (data, width, height)
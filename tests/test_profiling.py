@@ -0,0 +1,31 @@
+import json
+import os
+
+from pixel_font_build_tools import DesignContext, profiling
+
+project_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+glyphs_dir = os.path.join(project_root_dir, 'assets', 'glyphs')
+
+
+def test_profiler(tmp_path):
+    with profiling.Profiler(slowest_glyphs_count=3) as profiler:
+        context = DesignContext.load(glyphs_dir, defined_dir_flavors=['monospaced', 'proportional'], defined_name_flavors=['latin', 'zh_cn', 'zh_hk', 'zh_tw', 'zh_tr', 'ja', 'ko'])
+        context.get_sequence()
+        context.get_sequence()
+    assert not profiling.is_active()
+
+    file_count = len(context.path_to_glyph_file)
+    assert profiler.counters['load.files_scanned'] == file_count
+    assert profiler.counters['load.bytes_read'] > 0
+    assert profiler.counters['query.resolved_index_cacher.hit'] == 1
+    assert profiler.counters['query.resolved_index_cacher.miss'] == 1
+    assert profiler.glyph_decode_count == file_count
+    assert len(profiler.slowest_glyph_decodes) == 3
+    assert 'load.decode' in profiler.stage_times
+
+    file_path = os.path.join(tmp_path, 'profile.json')
+    profiler.save_json(file_path)
+    with open(file_path, 'r', encoding='utf-8') as file:
+        report = json.load(file)
+    assert report['stages']['load.scan']['calls'] == 1
+    assert report['glyph_decode']['count'] == file_count
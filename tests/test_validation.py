@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from pixel_font_build_tools import validation
+
+project_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+glyphs_dir = os.path.join(project_root_dir, 'assets', 'glyphs')
+
+dir_flavors = ['monospaced', 'proportional']
+name_flavors = ['latin', 'zh_cn', 'zh_hk', 'zh_tw', 'zh_tr', 'ja', 'ko']
+
+
+def test_validate_glyph_files():
+    assert validation.validate_glyph_files(glyphs_dir, dir_flavors, name_flavors, check_png_headers=True) == []
+
+
+def test_validate_glyph_files_errors(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    latin_dir = os.path.join(root_dir, 'monospaced', '0000-007F Basic Latin')
+    cjk_dir = os.path.join(root_dir, 'common', '4E00-9FFF CJK Unified Ideographs', '8F-')
+    os.makedirs(os.path.join(root_dir, 'bold'))
+    shutil.copyfile(os.path.join(latin_dir, '0041.png'), os.path.join(root_dir, 'monospaced', '0041.png'))
+    shutil.copyfile(os.path.join(latin_dir, '0041.png'), os.path.join(latin_dir, 'XYZ.png'))
+    shutil.copyfile(os.path.join(latin_dir, '0041.png'), os.path.join(latin_dir, '0042 fr.png'))
+    with open(os.path.join(latin_dir, '0043.png'), 'wb') as file:
+        file.write(b'not a png')
+    os.remove(os.path.join(cjk_dir, '8FC7.png'))
+
+    errors = validation.validate_glyph_files(root_dir, dir_flavors, name_flavors, check_png_headers=True)
+    assert sorted(errors) == sorted([
+        "Undefined dir flavor: 'bold'",
+        f"Glyph file default name flavor already exists:\n'{os.path.join(root_dir, 'monospaced', '0041.png')}'\n'{os.path.join(latin_dir, '0041.png')}'",
+        f"Glyph file invalid code point: '{os.path.join(latin_dir, 'XYZ.png')}'",
+        f"Glyph file undefined name flavor 'fr': '{os.path.join(latin_dir, '0042 fr.png')}'",
+        f"Not a PNG file or missing IHDR chunk: '{os.path.join(latin_dir, '0043.png')}'",
+        "No default name flavor: 'common 8FC7' (latin, zh_cn, ja)",
+    ])
+
+    errors = validation.validate_glyph_files(root_dir, dir_flavors, name_flavors, fallback_default_name_flavor=True)
+    assert len(errors) == 4
+
+
+def test_validate_glyph_files_optimized(tmp_path):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    latin_dir = os.path.join(root_dir, 'monospaced', '0000-007F Basic Latin')
+    shutil.copyfile(os.path.join(latin_dir, '0041.png'), os.path.join(root_dir, 'monospaced', '0041.png'))
+    shutil.copyfile(os.path.join(latin_dir, '0041.png'), os.path.join(latin_dir, '0042 fr.png'))
+    shutil.copyfile(os.path.join(latin_dir, '0041.png'), os.path.join(latin_dir, '0044 latin.png'))
+    shutil.copyfile(os.path.join(latin_dir, '0041.png'), os.path.join(latin_dir, '0044 Latin.png'))
+
+    # Under 'python -O' every assert is stripped, so the checks must not depend on them.
+    script = 'import json, sys; from pixel_font_build_tools import validation; print(json.dumps(validation.validate_glyph_files(*json.loads(sys.argv[1]))))'
+    env = dict(os.environ, PYTHONPATH=os.path.join(project_root_dir, 'src'))
+    result = subprocess.run([sys.executable, '-O', '-c', script, json.dumps([root_dir, dir_flavors, name_flavors])], env=env, capture_output=True, check=True, text=True)
+    errors = json.loads(result.stdout)
+    assert errors == validation.validate_glyph_files(root_dir, dir_flavors, name_flavors)
+    assert sorted(errors) == sorted([
+        f"Glyph file default name flavor already exists:\n'{os.path.join(root_dir, 'monospaced', '0041.png')}'\n'{os.path.join(latin_dir, '0041.png')}'",
+        f"Glyph file undefined name flavor 'fr': '{os.path.join(latin_dir, '0042 fr.png')}'",
+        f"Glyph file name flavor 'latin' already exists:\n'{os.path.join(latin_dir, '0044 latin.png')}'\n'{os.path.join(latin_dir, '0044 Latin.png')}'",
+    ])
+
+
+def test_validate_glyph_files_scans_each_dir_once(tmp_path, monkeypatch):
+    root_dir = os.path.join(tmp_path, 'glyphs')
+    shutil.copytree(glyphs_dir, root_dir)
+    os.makedirs(os.path.join(root_dir, 'bold', 'nested'))
+    dir_count = sum(1 for dir_path, _, _ in os.walk(root_dir) if not dir_path.startswith(os.path.join(root_dir, 'bold')))
+
+    scanned_dir_paths = []
+    scandir = os.scandir
+
+    def counting_scandir(path):
+        scanned_dir_paths.append(os.fspath(path))
+        return scandir(path)
+
+    monkeypatch.setattr(os, 'scandir', counting_scandir)
+    assert validation.validate_glyph_files(root_dir, dir_flavors, name_flavors) == ["Undefined dir flavor: 'bold'"]
+    assert len(scanned_dir_paths) == len(set(scanned_dir_paths)) == dir_count